@@ -1,23 +1,147 @@
 import math
 import numpy as np
 
+from . import kernels
+
 NUMBER_OF_LICS = 15
+FLOAT_EPSILON = 0.00000001
+ALL_LICS_MASK = (1 << NUMBER_OF_LICS) - 1
+IMPLEMENTED_LICS = (0, 1, 2, 3, 4, 5, 6)
+DEFAULT_CHUNK_SIZE = 1 << 20
 
 
 class Decide:
     """Decide class
 
+    The Logical Connector Matrix and the Preliminary Unlocking Vector are compiled into
+    bitmasks when the instance is created, so that the combinational stage of the
+    decision only needs a few bitwise operations on the Conditions Met Vector code
+    (see encode_vector).
+
     Attributes:
         parameters (dict): Parameters for the LICs
         lcm (array): Logical Connector Matrix
         puv (array): Preliminary Unlocking Vector
+        vectorized (bool): Evaluate the LICs with the array engine
+        chunk_size (int): Number of points read at a time from a track that is not held
+            in memory, such as an np.memmap (see ChunkedTrack)
+        andd_masks (tuple): Bitmask of the ANDD connectors of each row of the LCM
+        orr_masks (tuple): Bitmask of the ORR connectors of each row of the LCM
+        not_used_masks (tuple): Bitmask of the NOT_USED connectors of each row
+        puv_mask (int): Bitmask of the LICs enabled in the PUV
+        truth_table (ndarray): Launch decision of every CMV code packed into bits, or
+            None when the table has not been built (see build_truth_table)
+        relevant_lics (tuple): Indices of the LICs that can change the decision
+        skipped_lics (tuple): Indices of the LICs that are never evaluated by decide()
+        evaluation_order (tuple): The relevant LICs, cheapest first
+        outcomes (list): Decision table of each step of the evaluation (see
+            compute_outcomes)
     """
 
-    def __init__(self, parameters, lcm, puv):
+    def __init__(
+        self,
+        parameters,
+        lcm,
+        puv,
+        vectorized=False,
+        truth_table=False,
+        costs=None,
+        hull_n_pts=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+    ):
         self.parameters = parameters
         self.lcm = lcm
         self.puv = puv
-        self.lic = LaunchInterceptorConditions(self.parameters)
+        if vectorized:
+            self.lic = VectorizedLaunchInterceptorConditions(
+                self.parameters, hull_n_pts, chunk_size
+            )
+        else:
+            self.lic = LaunchInterceptorConditions(
+                self.parameters, hull_n_pts, chunk_size
+            )
+        self.andd_masks, self.orr_masks, self.not_used_masks = compile_lcm(lcm)
+        if len(puv) != NUMBER_OF_LICS:
+            raise ValueError("PUV should have %d elements" % NUMBER_OF_LICS)
+        self.puv_mask = encode_vector(puv)
+        self.truth_table = None
+        if truth_table:
+            self.build_truth_table()
+        self.relevant_lics = self.compute_relevant_lics()
+        self.skipped_lics = tuple(
+            i for i in range(NUMBER_OF_LICS) if i not in self.relevant_lics
+        )
+        if costs is None:
+            costs = self.lic.estimate_costs()
+        self.evaluation_order = tuple(
+            sorted(self.relevant_lics, key=lambda i: costs[i])
+        )
+        self.outcomes = self.compute_outcomes(self.evaluation_order)
+
+    def build_truth_table(self):
+        """ Precomputes the launch decision for every possible CMV
+
+        For a fixed LCM and PUV the launch decision only depends on the 15 bits of the
+        CMV, so it is tabulated for all 2^15 CMV codes and packed into 4 KiB. Once the
+        table is built, decide_cmv_codes() answers with table lookups.
+
+        Returns
+            ndarray: The packed table, one bit per CMV code
+        """
+        self.truth_table = None
+        codes = np.arange(1 << NUMBER_OF_LICS)
+        self.truth_table = np.packbits(self.decide_cmv_codes(codes), bitorder="little")
+        return self.truth_table
+
+    def compute_relevant_lics(self):
+        """ Finds the LICs whose value can influence the launch decision
+
+        A LIC is relevant when there are two CMVs that only differ by that LIC and lead
+        to different decisions. A LIC whose PUV entry is False and whose row and column
+        of the LCM are NOT_USED is never relevant, but neither is e.g. a LIC that is
+        only ORR'ed with a LIC that must be met anyway. Each LIC is considered as a free
+        input, even if it is not implemented yet.
+
+        Returns
+            tuple: The indices of the relevant LICs
+        """
+        codes = np.arange(1 << NUMBER_OF_LICS)
+        launch = self.decide_cmv_codes(codes)
+        return tuple(
+            i
+            for i in range(NUMBER_OF_LICS)
+            if np.any(launch != launch[codes ^ (1 << i)])
+        )
+
+    def compute_outcomes(self, order):
+        """ Tabulates when the decision is settled while evaluating LICs in order
+
+        Element k of the result is an array with one entry for each combination of the
+        values of the first k LICs of the order, read as a binary number with the
+        first LIC as the most significant bit. The entry is 1 or 0 when the decision
+        is launch or no launch whatever the values of the remaining LICs are, and -1
+        while it is still open. LICs that are not in the order must be irrelevant.
+
+        Args:
+            order (tuple): Indices of the LICs in evaluation order
+
+        Returns
+            list: One int8 array per step, from 1 entry up to 2^len(order) entries
+        """
+        prefixes = np.arange(1 << len(order))
+        codes = np.zeros_like(prefixes)
+        for depth, i in enumerate(order):
+            codes |= (prefixes >> (len(order) - 1 - depth) & 1) << i
+        launch = self.decide_cmv_codes(codes)
+
+        outcomes = []
+        for depth in range(len(order) + 1):
+            blocks = launch.reshape(1 << depth, -1)
+            outcome = np.full(1 << depth, -1, dtype=np.int8)
+            outcome[blocks.all(axis=1)] = 1
+            outcome[~blocks.any(axis=1)] = 0
+            outcomes.append(outcome)
+        return outcomes
 
     def decide(self, points):
         """ Computes launch decision
@@ -25,17 +149,161 @@ class Decide:
         Generates a boolean signal which determines whether an interceptor should be
         launched based upon input radar tracking information.
 
+        The relevant LICs are evaluated one at a time, cheapest first, and the
+        evaluation stops as soon as the remaining LICs cannot change the decision. The
+        parameters of the LICs that are not evaluated are not checked. When all the
+        relevant LICs are evaluated and the truth table is built, the decision is
+        looked up in the table.
+
+        An np.memmap, or a ChunkedTrack, is evaluated chunk by chunk, so that only
+        chunk_size points are held in memory at a time.
+
         Args:
-            points (array): List of coordinates of data points
+            points (array): List of coordinates of data points, an np.memmap or a
+                ChunkedTrack
 
         Returns
             boolean: The launch decision
         """
-        cmv = self.lic.get_conditions_met_vector(points)
-        pum = self.compute_preliminary_unlocking_matrix(cmv)
-        fuv = self.compute_final_unlocking_vector(pum)
-        launch = all(fuv)
-        return launch
+        points = self.lic.prepare_points(points)
+        prefix = 0
+        cmv_code = 0
+        for depth, i in enumerate(self.evaluation_order):
+            outcome = self.outcomes[depth][prefix]
+            if outcome >= 0:
+                return bool(outcome)
+            met = bool(self.lic.evaluate(i, points))
+            prefix = prefix << 1 | met
+            cmv_code |= met << i
+        if self.truth_table is not None:
+            return bool(self.decide_cmv_codes(cmv_code))
+        return bool(self.outcomes[-1][prefix])
+
+    def decide_many(self, points, offsets=None, return_cmv=False):
+        """ Computes the launch decisions of a batch of tracks
+
+        The tracks are either given as a dense (B, N, 2) array of B tracks of N points,
+        or as a ragged batch: a flat (P, 2) array with the points of all the tracks one
+        after the other, and the B+1 offsets of the tracks in that array. All the
+        tracks are evaluated at once with the vectorized engine, and only windows of
+        consecutive points lying inside a single track are considered.
+
+        Only the relevant LICs are evaluated, unless the CMVs are requested. The
+        parameters are checked against the length of the shortest track.
+
+        Args:
+            points (ndarray): (B, N, 2) array of tracks, or (P, 2) array of points
+            offsets (array): B+1 offsets for a ragged batch, track k is
+                points[offsets[k]:offsets[k+1]]
+            return_cmv (bool): Also return the CMV of each track
+
+        Returns
+            ndarray: The B launch decisions, and the (B, NUMBER_OF_LICS) CMVs when
+                return_cmv is True
+        """
+        points = np.asarray(points, dtype=float)
+        if offsets is None:
+            if points.ndim != 3 or points.shape[2] != 2:
+                raise ValueError("points should be a (B, N, 2) array of tracks")
+            offsets = np.arange(len(points) + 1) * points.shape[1]
+            points = points.reshape(-1, 2)
+
+        lic = self.lic
+        if not isinstance(lic, VectorizedLaunchInterceptorConditions):
+            lic = VectorizedLaunchInterceptorConditions(
+                self.parameters, self.lic.hull_n_pts
+            )
+        lics = None if return_cmv else self.relevant_lics
+        cmvs = lic.get_conditions_met_matrix(points, offsets, lics)
+        decisions = self.decide_cmv_codes(encode_vectors(cmvs))
+        if return_cmv:
+            return decisions, cmvs
+        return decisions
+
+    def decide_cmv_codes(self, cmv_codes):
+        """ Computes the launch decisions for an array of encoded CMVs
+
+        Args:
+            cmv_codes (ndarray): Array of CMV codes (see encode_vector)
+
+        Returns
+            ndarray: Array of launch decisions, with the same shape as cmv_codes
+        """
+        cmv_codes = np.asarray(cmv_codes, dtype=np.int64)
+        if self.truth_table is not None:
+            packed = self.truth_table[cmv_codes >> 3]
+            return (packed >> (cmv_codes & 7) & 1).astype(bool)
+        return self.compute_final_unlocking_codes(cmv_codes) == ALL_LICS_MASK
+
+    def compute_preliminary_unlocking_row(self, cmv_code, row):
+        """ Computes one row of the Preliminary Unlocking Matrix
+
+        Args:
+            cmv_code (int): The Conditions Met Vector encoded as an integer
+            row (int): Index of the row
+
+        Returns
+            int: The PUM row encoded as an integer
+        """
+        if cmv_code >> row & 1:
+            return (
+                self.not_used_masks[row]
+                | self.orr_masks[row]
+                | (self.andd_masks[row] & cmv_code)
+            )
+        return self.not_used_masks[row] | (self.orr_masks[row] & cmv_code)
+
+    def compute_final_unlocking_code(self, cmv_code):
+        """ Computes the Final Unlocking Vector from an encoded CMV
+
+        A row of the PUM is all true when it has no ANDD or ORR connector to an unmet
+        LIC, and when the LIC of the row itself is met or the row has no ANDD connector.
+
+        Args:
+            cmv_code (int): The Conditions Met Vector encoded as an integer
+
+        Returns
+            int: The Final Unlocking Vector encoded as an integer
+        """
+        unmet = ~cmv_code
+        fuv_code = ALL_LICS_MASK & ~self.puv_mask
+        for row in range(NUMBER_OF_LICS):
+            if not self.puv_mask >> row & 1:
+                continue
+            andd = self.andd_masks[row]
+            if cmv_code >> row & 1:
+                unlocked = not andd & unmet
+            else:
+                unlocked = not andd and not self.orr_masks[row] & unmet
+            if unlocked:
+                fuv_code |= 1 << row
+        return fuv_code
+
+    def compute_final_unlocking_codes(self, cmv_codes):
+        """ Computes the Final Unlocking Vectors of an array of encoded CMVs
+
+        Vectorized version of compute_final_unlocking_code.
+
+        Args:
+            cmv_codes (ndarray): Array of CMV codes (see encode_vector)
+
+        Returns
+            ndarray: Array of FUV codes, with the same shape as cmv_codes
+        """
+        cmv_codes = np.asarray(cmv_codes, dtype=np.int64)
+        unmet = ~cmv_codes
+        fuv_codes = np.full(cmv_codes.shape, ALL_LICS_MASK & ~self.puv_mask)
+        for row in range(NUMBER_OF_LICS):
+            if not self.puv_mask >> row & 1:
+                continue
+            met = (cmv_codes >> row & 1).astype(bool)
+            andd = self.andd_masks[row]
+            if andd:
+                unlocked = met & (andd & unmet == 0)
+            else:
+                unlocked = met | (self.orr_masks[row] & unmet == 0)
+            fuv_codes[unlocked] |= 1 << row
+        return fuv_codes
 
     def compute_preliminary_unlocking_matrix(self, cmv):
         """ Computes the Preliminary Unlocking Matrix
@@ -44,19 +312,16 @@ class Decide:
         to form the Preliminary Unlocking Matrix (PUM)
 
         Args:
-            points (array): List of coordinates of data points
+            cmv (array): The Conditions Met Vector
 
         Returns
             array: The PUM as a 2-d array of booleans
         """
-        pum = [[None] * NUMBER_OF_LICS for i in range(NUMBER_OF_LICS)]
-
-        for row in range(NUMBER_OF_LICS):
-            for column in range(NUMBER_OF_LICS):
-                pum[row][column] = LogicalConnector.create_from_string(
-                    self.lcm[row][column]
-                ).apply(cmv[row], cmv[column])
-        return pum
+        cmv_code = encode_vector(cmv)
+        return [
+            decode_vector(self.compute_preliminary_unlocking_row(cmv_code, row))
+            for row in range(NUMBER_OF_LICS)
+        ]
 
     def compute_final_unlocking_vector(self, pum):
         """ Computes the Final Unlocking Vector
@@ -72,11 +337,207 @@ class Decide:
         """
         fuv = [False for i in range(NUMBER_OF_LICS)]
         for row in range(NUMBER_OF_LICS):
-            if self.puv[row] is False or all(pum[row]):
+            if not self.puv_mask >> row & 1 or all(pum[row]):
                 fuv[row] = True
         return fuv
 
 
+def encode_vector(vector):
+    """ Encodes a vector of booleans as an integer
+
+    Bit i of the code is set when element i of the vector is true. This is used for the
+    CMV, the PUV, the FUV and the rows of the PUM.
+
+    Args:
+        vector (array): List of booleans
+
+    Returns
+        int: The encoded vector
+    """
+    code = 0
+    for i, value in enumerate(vector):
+        if value:
+            code |= 1 << i
+    return code
+
+
+def decode_vector(code):
+    """ Decodes an integer into a vector of NUMBER_OF_LICS booleans
+
+    Args:
+        code (int): The encoded vector
+
+    Returns
+        list: The vector as a list of booleans
+    """
+    return [bool(code >> i & 1) for i in range(NUMBER_OF_LICS)]
+
+
+def encode_vectors(vectors):
+    """ Encodes an array of boolean vectors as integers
+
+    Vectorized version of encode_vector.
+
+    Args:
+        vectors (ndarray): (..., NUMBER_OF_LICS) array of booleans
+
+    Returns
+        ndarray: The encoded vectors as uint16
+    """
+    weights = (1 << np.arange(NUMBER_OF_LICS)).astype(np.uint16)
+    vectors = np.asarray(vectors, dtype=bool)
+    return (vectors * weights).sum(axis=-1, dtype=np.uint16)
+
+
+def decode_vectors(codes):
+    """ Decodes an array of integers into boolean vectors
+
+    Vectorized version of decode_vector.
+
+    Args:
+        codes (ndarray): Array of encoded vectors
+
+    Returns
+        ndarray: (..., NUMBER_OF_LICS) array of booleans
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    return (codes[..., None] >> np.arange(NUMBER_OF_LICS) & 1).astype(bool)
+
+
+def compile_lcm(lcm):
+    """ Compiles the Logical Connector Matrix into bitmasks
+
+    Bit j of the mask of row i is set when LCM[i][j] is the corresponding connector.
+
+    Args:
+        lcm (array): Logical Connector Matrix
+
+    Returns
+        tuple: The ANDD, ORR and NOT_USED masks, each a tuple with one mask per row
+    """
+    if len(lcm) != NUMBER_OF_LICS or any(len(row) != NUMBER_OF_LICS for row in lcm):
+        raise ValueError("LCM should be a %dx%d matrix" % ((NUMBER_OF_LICS,) * 2))
+    masks = {"ANDD": [], "ORR": [], "NOT_USED": []}
+    for row in lcm:
+        connectors = [str(LogicalConnector.create_from_string(s)) for s in row]
+        for name, row_masks in masks.items():
+            row_masks.append(encode_vector(c == name for c in connectors))
+    return tuple(masks["ANDD"]), tuple(masks["ORR"]), tuple(masks["NOT_USED"])
+
+
+def compile_lcms(lcms):
+    """ Compiles many Logical Connector Matrices into bitmasks
+
+    Vectorized version of compile_lcm.
+
+    Args:
+        lcms (array): (K, NUMBER_OF_LICS, NUMBER_OF_LICS) array of LCMs
+
+    Returns
+        tuple: The ANDD, ORR and NOT_USED masks, each a (K, NUMBER_OF_LICS) uint16
+            array with one mask per row of each LCM
+    """
+    lcms = np.asarray(lcms, dtype=object)
+    if lcms.ndim != 3 or lcms.shape[1:] != (NUMBER_OF_LICS, NUMBER_OF_LICS):
+        raise ValueError("LCM should be a %dx%d matrix" % ((NUMBER_OF_LICS,) * 2))
+    masks = tuple(encode_vectors(lcms == name) for name in ("ANDD", "ORR", "NOT_USED"))
+    known = masks[0] | masks[1] | masks[2]
+    if np.any(known != ALL_LICS_MASK):
+        unknown = lcms[decode_vectors(~known & ALL_LICS_MASK)]
+        raise ValueError("unknown operator %s" % (unknown[0]))
+    return masks
+
+
+def decide_configurations(
+    lcms, puvs, cmvs, return_fuv=False, packed=False, block_size=1 << 22
+):
+    """ Computes the launch decisions of many configurations for many CMVs
+
+    The combinational stage is evaluated for K pairs of LCM and PUV and M CMVs at
+    once, on the bitmasks of the LCMs (see compile_lcms) and the CMV codes.
+
+    A row of the FUV is false exactly when a mask of LICs selected by the row (which
+    depends on whether the LIC of the row is met) has an unmet LIC. As the selected
+    masks of all the rows can be OR'ed together, the launch decision only requires
+    the OR of the rows of each configuration for the met LICs of the CMV, which is
+    tabulated for each configuration on the low 8 and the high 7 bits of the CMV code.
+    Each distinct CMV is evaluated once, and the configurations are processed in
+    blocks of about block_size configuration-CMV pairs to bound the memory used.
+
+    Args:
+        lcms (array): (K, NUMBER_OF_LICS, NUMBER_OF_LICS) array of LCMs
+        puvs (array): (K, NUMBER_OF_LICS) array of PUVs
+        cmvs (ndarray): (M, NUMBER_OF_LICS) boolean array of CMVs, or M CMV codes
+        return_fuv (bool): Also return the FUV code of each configuration and CMV
+        packed (bool): Return the decisions packed into bits along the CMVs, see
+            numpy.packbits with bitorder="little"
+        block_size (int): Number of configuration-CMV pairs processed at once
+
+    Returns
+        ndarray: (K, M) launch decisions, and the (K, M) FUV codes when return_fuv is
+            True
+    """
+    andd_masks, orr_masks, _ = compile_lcms(lcms)
+    puvs = np.asarray(puvs, dtype=bool)
+    if puvs.shape != andd_masks.shape:
+        raise ValueError("PUVs should have %d elements, one per LCM" % NUMBER_OF_LICS)
+    cmv_codes = np.asarray(cmvs)
+    if cmv_codes.ndim == 2:
+        cmv_codes = encode_vectors(cmv_codes)
+    codes, inverse = np.unique(cmv_codes.astype(np.uint16), return_inverse=True)
+    unmet = ~codes & ALL_LICS_MASK
+
+    # Mask selected by each row when its LIC is met or not: the row is false when
+    # the mask has an unmet LIC (a row with ANDD connectors is false when its own LIC
+    # is not met, and rows that are not in the PUV are never false)
+    zero = np.uint16(0)
+    anded = puvs & (andd_masks != 0)
+    met_masks = np.where(anded, andd_masks, zero)
+    unmet_masks = np.where(anded, np.uint16(ALL_LICS_MASK), orr_masks)
+    unmet_masks = np.where(puvs, unmet_masks, zero)
+
+    def selection_table(rows):
+        patterns = np.arange(1 << len(rows))
+        table = np.zeros((len(puvs), len(patterns)), dtype=np.uint16)
+        for bit, row in enumerate(rows):
+            met = (patterns >> bit & 1).astype(bool)
+            table |= np.where(met, met_masks[:, row, None], unmet_masks[:, row, None])
+        return table
+
+    low_table = selection_table(range(8))
+    high_table = selection_table(range(8, NUMBER_OF_LICS))
+
+    num_configurations = len(puvs)
+    if packed:
+        decisions = np.zeros((num_configurations, -(-len(cmv_codes) // 8)), np.uint8)
+    else:
+        decisions = np.zeros((num_configurations, len(cmv_codes)), dtype=bool)
+    if return_fuv:
+        fuv_codes = np.zeros((num_configurations, len(cmv_codes)), dtype=np.uint16)
+    step = max(block_size // max(len(codes), 1), 1)
+    for first in range(0, num_configurations, step):
+        block = slice(first, first + step)
+        selected = low_table[block][:, codes & 0xFF]
+        selected |= high_table[block][:, codes >> 8]
+        launch = (selected & unmet == 0)[:, inverse]
+        if packed:
+            launch = np.packbits(launch, axis=1, bitorder="little")
+        decisions[block] = launch
+        if return_fuv:
+            fuv = np.zeros(selected.shape, dtype=np.uint16)
+            for row in range(NUMBER_OF_LICS):
+                met = codes >> row & 1 != 0
+                masks = np.where(
+                    met, met_masks[block, row, None], unmet_masks[block, row, None]
+                )
+                fuv |= np.where(masks & unmet == 0, np.uint16(1 << row), zero)
+            fuv_codes[block] = fuv[:, inverse]
+
+    if return_fuv:
+        return decisions, fuv_codes
+    return decisions
+
+
 class LogicalConnector:
     @staticmethod
     def create_from_string(string):
@@ -153,54 +614,207 @@ class LaunchInterceptorConditions:
 
     Attributes:
         parameters (dict): Parameters for the LICs
+        hull_n_pts (int): N_PTS from which LIC 6 only examines the vertices of convex
+            hulls (see kernels.chord_distances_hull), or None to examine every point
+        chunk_size (int): Number of points read at a time from an np.memmap, see
+            ChunkedTrack
     """
 
-    def __init__(self, parameters):
+    def __init__(self, parameters, hull_n_pts=None, chunk_size=DEFAULT_CHUNK_SIZE):
         self.parameters = parameters
+        self.hull_n_pts = hull_n_pts
+        self.chunk_size = chunk_size
 
-    def get_conditions_met_vector(self, points):
+    def get_conditions_met_vector(self, points, lics=None):
         """ Gets the Conditions Met Vector for the data points
 
         Each element of the Conditions Met Vector (CMV) is set according to the evaluation
         of each of the Launch Interceptor Conditions (LIC) given the parameter values.
 
+        An np.memmap, or a ChunkedTrack, is read once, chunk by chunk, and a LIC is not
+        evaluated on the following chunks once it is met.
+
         Args:
-            points (list): List of coordinates of data points
+            points (list): List of coordinates of data points, an np.memmap or a
+                ChunkedTrack
+            lics (iterable): Indices of the LICs to evaluate, the other elements of the
+                CMV are left False. All the LICs are evaluated by default
 
         Returns
             list: The CMV as a list of booleans
         """
         cmv = [False] * NUMBER_OF_LICS
 
-        cmv[0] = self.lic_0(points)
-        cmv[1] = self.lic_1(points)
-        cmv[2] = self.lic_2(points)
-        cmv[3] = self.lic_3(points)
-        cmv[4] = self.lic_4(points)
-        cmv[5] = self.lic_5(points)
-        cmv[6] = self.lic_6(points)
+        points = self.prepare_points(points)
+        if lics is None:
+            lics = range(NUMBER_OF_LICS)
+        if isinstance(points, ChunkedTrack):
+            pending = [i for i in lics if i in IMPLEMENTED_LICS]
+            for i in pending:
+                self.check_parameters(i, len(points))
+            halo = max([self.window_size(i) for i in pending] + [1]) - 1
+            for chunk in points.chunks(halo):
+                chunk = self.prepare_points(chunk)
+                for i in list(pending):
+                    if self.evaluate(i, chunk):
+                        cmv[i] = True
+                        pending.remove(i)
+                if not pending:
+                    break
+            return cmv
+        for i in lics:
+            cmv[i] = self.evaluate(i, points)
 
         return cmv
 
+    def prepare_points(self, points):
+        """ Converts the data points to the representation used by the LICs
+
+        The points are wrapped in a TrackGeometry, so that the LICs evaluated on them
+        share the distances and cross products they compute. An np.memmap is wrapped in
+        a ChunkedTrack instead, so that it is not loaded in memory.
+
+        Args:
+            points (list): List of coordinates of data points
+
+        Returns
+            TrackGeometry: The data points and their cached geometry, or a ChunkedTrack
+        """
+        if isinstance(points, (np.memmap, ChunkedTrack)):
+            return ChunkedTrack.of(points, self.chunk_size)
+        return TrackGeometry.of(points)
+
+    def evaluate(self, i, points):
+        """ Checks whether a Launch Interceptor Condition is met
+
+        Args:
+            i (int): Index of the LIC
+            points (list): List of coordinates of data points
+
+        Returns
+            bool: True if the condition is met, False if it is not or if the LIC is not
+                implemented
+        """
+        condition = getattr(self, "lic_%d" % i, None)
+        if condition is None:
+            return False
+        if isinstance(points, (np.memmap, ChunkedTrack)):
+            points = ChunkedTrack.of(points, self.chunk_size)
+            self.check_parameters(i, len(points))
+            return any(
+                condition(self.prepare_points(chunk))
+                for chunk in points.chunks(max(self.window_size(i) - 1, 0))
+            )
+        return condition(points)
+
+    def window_size(self, i):
+        """ Gets the number of consecutive data points a LIC is evaluated on
+
+        Args:
+            i (int): Index of the LIC
+
+        Returns
+            int: The number of points in a window
+        """
+        if i == 4:
+            return self.parameters["q_pts"]
+        if i == 6:
+            return self.parameters["n_pts"]
+        return 2 if i in (0, 5) else 3
+
+    def check_parameters(self, i, num_points):
+        """ Checks that the parameters of a LIC are within their allowed range
+
+        Args:
+            i (int): Index of the LIC
+            num_points (int): Number of data points the LIC is evaluated on
+
+        Raises
+            ValueError: If a parameter is outside its allowed range
+        """
+        if i == 2:
+            if self.parameters["epsilon"] < 0 or self.parameters["epsilon"] >= math.pi:
+                raise ValueError("EPSILON value outside allowed range")
+        elif i == 3:
+            if self.parameters["area1"] < 0:
+                raise ValueError("AREA1 value outside allowed range")
+        elif i == 4:
+            if self.parameters["q_pts"] < 2 or self.parameters["q_pts"] > num_points:
+                raise ValueError("Q_PTS value outside allowed range")
+            if self.parameters["quads"] < 1 or self.parameters["quads"] > 3:
+                raise ValueError("QUADS value outside allowed range")
+        elif i == 6:
+            if self.parameters["n_pts"] > num_points:
+                raise ValueError("N_PTS value outside allowed range")
+            if self.parameters["dist"] < 0:
+                raise ValueError("DIST value outside allowed range")
+
+    def estimate_costs(self):
+        """ Estimates the relative cost of evaluating each LIC
+
+        The costs are per data point, in units of the computation of the distance
+        between two points. LICs that are not implemented cost nothing.
+
+        Returns
+            list: The estimated cost of each LIC
+        """
+        costs = [0] * NUMBER_OF_LICS
+        costs[0] = 1
+        costs[1] = 5
+        costs[2] = 4
+        costs[3] = 4
+        costs[4] = 1 + self.parameters.get("q_pts", 0)
+        costs[5] = 0.5
+        costs[6] = 4 * max(self.chord_window_size() - 2, 1)
+        return costs
+
+    def chord_distances(self, points):
+        """ Calculates the largest distance to the chord of each N_PTS window
+
+        Large windows are handled with convex hulls when hull_n_pts is set, which gives
+        the same distances in O(log^2 N) per window instead of O(N_PTS).
+
+        Args:
+            points (ndarray): (N, 2) array of points
+
+        Returns
+            ndarray: The N-N_PTS+1 largest distances (0 when N_PTS < 3)
+        """
+        n_pts = self.parameters["n_pts"]
+        if self.hull_n_pts is not None and n_pts >= self.hull_n_pts:
+            return kernels.chord_distances_hull(points, n_pts)
+        return kernels.chord_distances(points, n_pts)
+
+    def chord_window_size(self):
+        """ Gets the number of points examined per window by chord_distances
+
+        Returns
+            int: N_PTS, or at most hull_n_pts when convex hulls are used
+        """
+        n_pts = self.parameters.get("n_pts", 0)
+        if self.hull_n_pts is not None:
+            n_pts = min(n_pts, self.hull_n_pts)
+        return n_pts
+
     def lic_0(self, points):
         """ Checks whether Launch Interceptor Condition 0 is met
 
         Determines whether there exist two consecutive points that are a distance
         greater than LENGTH1 apart
 
+        Only the largest squared distance is compared, with LENGTH1 squared.
+
         Args:
             points (list): List of coordinates of data points
 
         Returns
             bool: True if the condition is met
         """
-        for i in range(len(points) - 1):
-            point1 = Point(points[i])
-            point2 = Point(points[i + 1])
-            dist = point1.distance(point2)
-            if dist > self.parameters["length1"]:
-                return True
-        return False
+        geometry = TrackGeometry.of(points)
+        if len(geometry) < 2:
+            return False
+        distances = geometry.squared_distances()
+        return bool(distances_exceed(distances.max(), self.parameters["length1"]))
 
     def lic_1(self, points):
         """ Checks whether Launch Interceptor Condition 1 is met
@@ -208,22 +822,21 @@ class LaunchInterceptorConditions:
         Determines whether there exists at least one set of three consecutive data points
         that cannot all be contained within or on a circle of radius RADIUS1
 
+        The smallest circle containing three points has the longest side as diameter
+        when the triangle is not acute, and is the circumscribed circle otherwise. The
+        radii of all the triangles are compared at once, squared.
+
         Args:
             points (list): List of coordinates of data points
 
         Returns
             bool: True if the condition is met
         """
-        for i in range(len(points) - 2):
-            triangle = Triangle(
-                Point(points[i]), Point(points[i + 1]), Point(points[i + 2])
-            )
-            R = triangle.circumradius()
-            if R > self.parameters["radius1"] and not float_almost_equal(
-                R, self.parameters["radius1"]
-            ):
-                return True
-        return False
+        geometry = TrackGeometry.of(points)
+        radii = kernels.triangle_enclosing_radii_squared(
+            geometry.array(), geometry.squared_distances(), geometry.cross_products()
+        )
+        return bool(np.any(radii_exceed(radii, self.parameters["radius1"])))
 
     def lic_2(self, points):
         """ Checks whether Launch Interceptor Condition 2 is met
@@ -231,28 +844,30 @@ class LaunchInterceptorConditions:
         Determines whether there exists at least one set of three consecutive data points
         which form an angle such that: angle < (PI − EPSILON) or angle > (PI + EPSILON)
 
+        The angles are not computed: the cosine of each angle is compared with
+        cos(EPSILON), see angle_deviates_from_pi.
+
         Args:
             points (list): List of coordinates of data points
 
         Returns
             bool: True if the condition is met
         """
-        if self.parameters["epsilon"] < 0 or self.parameters["epsilon"] >= math.pi:
-            raise ValueError("EPSILON value outside allowed range")
+        self.check_parameters(2, len(points))
+        geometry = TrackGeometry.of(points)
+        cos_epsilon = math.cos(self.parameters["epsilon"])
         for i in range(len(points) - 2):
-            first_point = Point(points[i])
-            vertex = Point(points[i + 1])
-            last_point = Point(points[i + 2])
+            first_point = geometry.point(i)
+            vertex = geometry.point(i + 1)
+            last_point = geometry.point(i + 2)
 
             if vertex in (first_point, last_point):
                 # If either the first point or the last point (or both) coincides with the
                 # vertex, the angle is undefined and the LIC is not satisfied by those
                 # three points.
                 continue
-            else:
-                angle = Triangle(first_point, vertex, last_point).angle_abc()
-                if not float_almost_equal(math.pi, angle, self.parameters["epsilon"]):
-                    return True
+            elif angle_deviates_from_pi(first_point, vertex, last_point, cos_epsilon):
+                return True
         return False
 
     def lic_3(self, points):
@@ -261,22 +876,19 @@ class LaunchInterceptorConditions:
         Determines whether there exists at least one set of three consecutive data points
         that are the vertices of a triangle with area greater than AREA1
 
+        The areas of all the triangles are computed at once with the shoelace formula
+        (see kernels.triangle_areas).
+
         Args:
             points (list): List of coordinates of data points
 
         Returns
             bool: True if the condition is met
         """
-        if self.parameters["area1"] < 0:
-            raise ValueError("AREA1 value outside allowed range")
-        for i in range(len(points) - 2):
-            triangle = Triangle(
-                Point(points[i]), Point(points[i + 1]), Point(points[i + 2])
-            )
-
-            if triangle.area() > self.parameters["area1"]:
-                return True
-        return False
+        self.check_parameters(3, len(points))
+        geometry = TrackGeometry.of(points)
+        areas = kernels.triangle_areas(geometry.array(), geometry.cross_products())
+        return bool(np.any(areas > self.parameters["area1"]))
 
     def lic_4(self, points):
         """ Checks whether Launch Interceptor Condition 4 is met
@@ -284,32 +896,22 @@ class LaunchInterceptorConditions:
         Determines whether there exists at least one set of Q_PTS consecutive data points
         that lie in more than QUADS quadrants.
 
+        The quadrants of all the points are computed at once, and the quadrants of each
+        window are counted with a rolling histogram (see
+        kernels.window_quadrant_counts), so the cost does not depend on Q_PTS.
+
         Args:
             points (list): List of coordinates of data points
 
         Returns
             bool: True if the condition is met
         """
-        if self.parameters["q_pts"] < 2 or self.parameters["q_pts"] > len(points):
-            raise ValueError("Q_PTS value outside allowed range")
-        if self.parameters["quads"] < 1 or self.parameters["quads"] > 3:
-            raise ValueError("QUADS value outside allowed range")
-
-        # Rolling list containing the quadrant ids of the latest Q_PTS points
-        quadrants_list = [None] * self.parameters["q_pts"]
-
-        for i in range(len(points)):
-            point = Point(points[i])
-            # Add the quadrant id of the current point to the rolling list
-            quadrants_list[i % self.parameters["q_pts"]] = point.quadrant()
-            # Count the number of unique quadrants in the list
-            num_quads = len(
-                set([value for idx, value in enumerate(quadrants_list, 1) if value])
-            )
-
-            if num_quads > self.parameters["quads"]:
-                return True
-        return False
+        self.check_parameters(4, len(points))
+        geometry = TrackGeometry.of(points)
+        counts = kernels.window_quadrant_counts(
+            geometry.array(), self.parameters["q_pts"]
+        )
+        return bool(np.any(counts > self.parameters["quads"]))
 
     def lic_5(self, points):
         """ Checks whether Launch Interceptor Condition 5 is met
@@ -323,10 +925,8 @@ class LaunchInterceptorConditions:
         Returns
             bool: True if the condition is met
         """
-        for i in range(len(points) - 1):
-            if Point(points[i + 1]).x < Point(points[i]).x:
-                return True
-        return False
+        geometry = TrackGeometry.of(points)
+        return bool(np.any(kernels.x_decreases(geometry.array())))
 
     def lic_6(self, points):
         """ Checks whether Launch Interceptor Condition 6 is met
@@ -338,53 +938,251 @@ class LaunchInterceptorConditions:
         will be the distance from the coincident point to all other points of the N PTS
         consecutive points. The condition is not met when NUMPOINTS < 3
 
+        All the windows are evaluated at once, the distance of a point to the line being
+        given by the cross product of the chord and the vector from its first point.
+
         Args:
             points (list): List of coordinates of data points
 
         Returns
             bool: True if the condition is met
         """
-        if self.parameters["n_pts"] > len(points):
-            raise ValueError("N_PTS value outside allowed range")
-        if self.parameters["dist"] < 0:
-            raise ValueError("DIST value outside allowed range")
+        self.check_parameters(6, len(points))
+        geometry = TrackGeometry.of(points)
+        distances = self.chord_distances(geometry.array())
+        return bool(np.any(distances > self.parameters["dist"]))
 
-        n_pts = self.parameters["n_pts"]
 
-        for i in range(len(points) - n_pts + 1):
-            start_point = Point(points[i])
-            end_point = Point(points[i + n_pts - 1])
+class VectorizedLaunchInterceptorConditions(LaunchInterceptorConditions):
+    """Vectorized Launch Interceptor Conditions class
 
-            if start_point == end_point:
-                for j in range(1, n_pts - 1):
-                    dist = start_point.distance(Point(points[i + j]))
-                    if dist > self.parameters["dist"]:
-                        return True
-            else:
-                """
-                If the points are distinct, the distance from a point P to the line defined
-                by start_point and end_point is the perpendicular height from P of the
-                triangle defined by P, start_point and end_point.
-                The standard formula of the area of the triangle is A = (b*h)/2, where b
-                is the length of the base (i.e. the distance between start_point and end_point),
-                and h is the height we want to find. Thus h = 2*A / b.
-                """
-                b = start_point.distance(end_point)
-                for j in range(1, n_pts - 1):
-                    triangle = Triangle(start_point, end_point, Point(points[i + j]))
-                    h = 2 * triangle.area() / b
-                    if h > self.parameters["dist"]:
-                        return True
-        return False
+    Evaluates the same conditions as LaunchInterceptorConditions, but converts the data
+    points once into an (N, 2) float array and evaluates each LIC with array operations
+    over the whole track instead of building Point and Triangle objects. The array is
+    wrapped in a TrackGeometry, so the LICs still share the distances and cross
+    products they compute.
+
+    Each LIC is first evaluated on every window of consecutive points (see
+    window_conditions), which also allows evaluating a whole batch of tracks at once.
+
+    Attributes:
+        parameters (dict): Parameters for the LICs
+    """
+
+    def prepare_points(self, points):
+        """ Converts the data points to the representation used by the LICs
+
+        An np.memmap is wrapped in a ChunkedTrack instead, so that it is not loaded in
+        memory.
+
+        Args:
+            points (array): List of coordinates of data points, or an (N, 2) array
+
+        Returns
+            TrackGeometry: The data points as an (N, 2) float array and their cached
+                geometry, or a ChunkedTrack
+        """
+        if isinstance(points, (np.memmap, ChunkedTrack)):
+            return ChunkedTrack.of(points, self.chunk_size)
+        geometry = TrackGeometry.of(points)
+        geometry.array()
+        return geometry
+
+    def estimate_costs(self):
+        """ Estimates the relative cost of evaluating each LIC
+
+        Returns
+            list: The estimated cost of each LIC, per data point
+        """
+        costs = [0] * NUMBER_OF_LICS
+        costs[0] = 1
+        costs[1] = 4
+        costs[2] = 3
+        costs[3] = 2
+        costs[4] = 2
+        costs[5] = 0.5
+        costs[6] = 2 * max(self.chord_window_size() - 2, 1)
+        return costs
+
+    def window_conditions(self, i, points):
+        """ Evaluates a LIC on each window of consecutive data points
+
+        Element j of the result tells whether the window of window_size(i) points
+        starting at point j meets the condition. The parameters are not checked.
+
+        Args:
+            i (int): Index of the LIC
+            points (ndarray): (N, 2) array of points, or a TrackGeometry
+
+        Returns
+            ndarray: One boolean per window
+        """
+        geometry = TrackGeometry.of(points)
+        points = geometry.array()
+        if i == 0:
+            distances = geometry.squared_distances()
+            return distances_exceed(distances, self.parameters["length1"])
+        if i == 1:
+            radii = kernels.triangle_enclosing_radii_squared(
+                points, geometry.squared_distances(), geometry.cross_products()
+            )
+            return radii_exceed(radii, self.parameters["radius1"])
+        if i == 2:
+            cos_epsilon = math.cos(self.parameters["epsilon"])
+            met = kernels.angles_deviate_from_pi(points, cos_epsilon)
+            return met & ~kernels.coincident_vertices(points)
+        if i == 3:
+            areas = kernels.triangle_areas(points, geometry.cross_products())
+            return areas > self.parameters["area1"]
+        if i == 4:
+            counts = kernels.window_quadrant_counts(points, self.parameters["q_pts"])
+            return counts > self.parameters["quads"]
+        if i == 5:
+            return kernels.x_decreases(points)
+        if i == 6:
+            distances = self.chord_distances(points)
+            return distances > self.parameters["dist"]
+        raise ValueError("LIC %d is not implemented" % i)
+
+    def evaluate(self, i, points):
+        """ Checks whether a Launch Interceptor Condition is met
+
+        Args:
+            i (int): Index of the LIC
+            points (array): List of coordinates of data points, or an (N, 2) array
+
+        Returns
+            bool: True if the condition is met, False if it is not or if the LIC is not
+                implemented
+        """
+        if i not in IMPLEMENTED_LICS:
+            return False
+        points = self.prepare_points(points)
+        self.check_parameters(i, len(points))
+        if isinstance(points, ChunkedTrack):
+            return any(
+                np.any(self.window_conditions(i, chunk))
+                for chunk in points.chunks(max(self.window_size(i) - 1, 0))
+            )
+        return bool(np.any(self.window_conditions(i, points)))
+
+    def get_conditions_met_matrix(self, points, offsets, lics=None):
+        """ Gets the Conditions Met Vectors of a batch of tracks
+
+        The tracks are stored one after the other in a single array of points. Windows
+        of consecutive points that straddle two tracks are ignored. The parameters are
+        checked against the length of the shortest track.
+
+        Args:
+            points (ndarray): (P, 2) array of the points of all the tracks
+            offsets (ndarray): B+1 offsets, track k is points[offsets[k]:offsets[k+1]]
+            lics (iterable): Indices of the LICs to evaluate, all of them by default
 
+        Returns
+            ndarray: (B, NUMBER_OF_LICS) array with the CMV of each track
+        """
+        points = self.prepare_points(points)
+        offsets = kernels.as_offsets_array(offsets, len(points))
+        shortest = int(np.diff(offsets).min(initial=len(points)))
+        cmvs = np.zeros((len(offsets) - 1, NUMBER_OF_LICS), dtype=bool)
+
+        if lics is None:
+            lics = range(NUMBER_OF_LICS)
+        for i in lics:
+            if i not in IMPLEMENTED_LICS:
+                continue
+            self.check_parameters(i, shortest)
+            met = self.window_conditions(i, points)
+            cmvs[:, i] = kernels.any_per_track(met, offsets, self.window_size(i))
+        return cmvs
+
+    def lic_0(self, points):
+        return self.evaluate(0, points)
 
-def float_almost_equal(a, b, epsilon=0.00000001):
+    def lic_1(self, points):
+        return self.evaluate(1, points)
+
+    def lic_2(self, points):
+        return self.evaluate(2, points)
+
+    def lic_3(self, points):
+        return self.evaluate(3, points)
+
+    def lic_4(self, points):
+        return self.evaluate(4, points)
+
+    def lic_5(self, points):
+        return self.evaluate(5, points)
+
+    def lic_6(self, points):
+        return self.evaluate(6, points)
+
+
+def float_almost_equal(a, b, epsilon=FLOAT_EPSILON):
     if abs(a - b) < epsilon:
         return True
     else:
         return False
 
 
+def distances_exceed(squared_distances, length):
+    """ Checks whether distances are greater than a length, on the squares
+
+    Args:
+        squared_distances (ndarray): The squared distances
+        length (ndarray): The length to compare with, or an array of lengths
+
+    Returns
+        ndarray: True for the distances greater than the length
+    """
+    return (length < 0) | (squared_distances > length * length)
+
+
+def radii_exceed(squared_radii, radius, epsilon=FLOAT_EPSILON):
+    """ Checks whether radii are larger than a radius and not almost equal to it
+
+    A radius R meets R > radius and not float_almost_equal(R, radius, epsilon) when
+    R >= radius + epsilon, which is checked on the squares.
+
+    Args:
+        squared_radii (ndarray): The squared radii
+        radius (ndarray): The radius to compare with, or an array of radii
+        epsilon (float): Tolerance of the comparison
+
+    Returns
+        ndarray: True for the radii that exceed the radius
+    """
+    threshold = radius + epsilon
+    return (threshold < 0) | (squared_radii >= threshold * threshold)
+
+
+def angle_deviates_from_pi(first_point, vertex, last_point, cos_epsilon):
+    """ Checks whether an angle differs from PI by at least EPSILON
+
+    The angle at the vertex deviates from PI by PI - theta, where theta (0 - PI) is the
+    angle between the vectors u and v from the vertex to the two other points. So it
+    deviates by at least EPSILON when cos(theta) >= cos(PI - EPSILON), i.e., when
+    u.v >= -cos(EPSILON) * |u| * |v|, which is decided on the squares of both sides
+    without any square root or trigonometric function.
+
+    Args:
+        first_point (Point): First point
+        vertex (Point): Vertex of the angle, distinct from the two other points
+        last_point (Point): Last point
+        cos_epsilon (float): cos(EPSILON)
+
+    Returns
+        bool: True if angle <= PI - EPSILON or angle >= PI + EPSILON
+    """
+    ux, uy = first_point.x - vertex.x, first_point.y - vertex.y
+    vx, vy = last_point.x - vertex.x, last_point.y - vertex.y
+    dot = ux * vx + uy * vy
+    bound = (cos_epsilon * cos_epsilon) * ((ux * ux + uy * uy) * (vx * vx + vy * vy))
+    if dot >= 0:
+        return cos_epsilon >= 0 or dot * dot >= bound
+    return cos_epsilon > 0 and bound >= dot * dot
+
+
 class Point:
     """Point class
 
@@ -448,29 +1246,32 @@ class Triangle:
         self._area = None
 
     def area(self):
-        """ Calculates the area of the triangle using Heron's formula
+        """ Calculates the area of the triangle using the shoelace formula
+
+        The area is half the absolute value of the cross product of the sides ab and
+        ac, which needs no square root and is exactly 0 for most collinear points.
 
         Returns
             float: The area
 
         """
         if self._area is None:
-            length1 = self.a.distance(self.b)
-            length2 = self.a.distance(self.c)
-            length3 = self.b.distance(self.c)
-
-            # calculate the semi-perimeter
-            s = (length1 + length2 + length3) / 2
-            # calculate the area
-            self._area = math.sqrt((s * (s - length1) * (s - length2) * (s - length3)))
+            cross = (self.b.x - self.a.x) * (self.c.y - self.a.y) - (
+                self.b.y - self.a.y
+            ) * (self.c.x - self.a.x)
+            self._area = abs(cross) / 2
         return self._area
 
     def circumradius(self):
-        """ Calculates the radius of the smallest circle containing this Triangle
+        """ Calculates the radius of the circle passing through the three vertices
 
         If a, b and c are the lengths of the sides and A is the area of the given
         triangle, the radius of the circumscribed circle is given by : R = a*b*c/(4*A)
 
+        This is not the radius of the smallest circle containing the triangle when the
+        triangle is not acute, see enclosing_radius. There is no circumscribed circle
+        when the points are collinear, and the longest length is returned instead.
+
         Returns
             float: The radius
         """
@@ -486,6 +1287,23 @@ class Triangle:
             R = length1 * length2 * length3 / (self.area() * 4)
         return R
 
+    def enclosing_radius(self):
+        """ Calculates the radius of the smallest circle containing this Triangle
+
+        As for LIC 1, the smallest circle has the longest side as diameter when the
+        triangle has an obtuse or right angle, or is degenerate, and is the circumscribed
+        circle otherwise (see kernels.triangle_enclosing_radii_squared).
+
+        Returns
+            float: The radius
+        """
+        lengths = sorted(
+            [self.a.distance(self.b), self.a.distance(self.c), self.b.distance(self.c)]
+        )
+        if self.area() == 0 or lengths[2] ** 2 >= lengths[0] ** 2 + lengths[1] ** 2:
+            return lengths[2] / 2
+        return self.circumradius()
+
     def angle_abc(self):
         """ Calculates the angle of the triangle at vertex b
 
@@ -499,3 +1317,149 @@ class Triangle:
         if angle < 0:
             angle = angle + 2 * math.pi
         return angle
+
+
+class TrackGeometry:
+    """Track Geometry class
+
+    Wraps the data points of one evaluation and caches the geometry shared by the LICs:
+    the array of the points, the squared distances between consecutive points (LIC 0
+    and LIC 1), the cross products of the triangles of three consecutive points (LIC 1
+    and LIC 3), and the Point objects. Everything is computed lazily, at most once.
+
+    A TrackGeometry can be used wherever the list of data points is expected.
+
+    Attributes:
+        points (list): List of coordinates of data points
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self._points = {}
+        self._array = None
+        self._squared_distances = None
+        self._cross_products = None
+
+    @classmethod
+    def of(cls, points):
+        """ Wraps data points in a TrackGeometry, unless they already are
+
+        Args:
+            points (list): List of coordinates of data points, or a TrackGeometry
+
+        Returns
+            TrackGeometry: The data points and their cached geometry
+        """
+        if isinstance(points, cls):
+            return points
+        return cls(points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, i):
+        return self.points[i]
+
+    def point(self, i):
+        """ Gets data point i
+
+        Args:
+            i (int): Index of the point
+
+        Returns
+            Point: The point
+        """
+        point = self._points.get(i)
+        if point is None:
+            point = self._points[i] = Point(self.points[i])
+        return point
+
+    def array(self):
+        """ Converts the data points to an array, for the vectorized computations
+
+        Returns
+            ndarray: The points as an (N, 2) float array
+        """
+        if self._array is None:
+            self._array = kernels.as_points_array(self.points)
+        return self._array
+
+    def squared_distances(self):
+        """ Calculates the squared distances between consecutive data points
+
+        Returns
+            ndarray: The N-1 squared distances, see kernels.consecutive_squared_distances
+        """
+        if self._squared_distances is None:
+            self._squared_distances = kernels.consecutive_squared_distances(
+                self.array()
+            )
+        return self._squared_distances
+
+    def cross_products(self):
+        """ Calculates the cross products of the triangles of three consecutive points
+
+        Returns
+            ndarray: The N-2 cross products, see kernels.triangle_cross_products
+        """
+        if self._cross_products is None:
+            self._cross_products = kernels.triangle_cross_products(self.array())
+        return self._cross_products
+
+
+class ChunkedTrack:
+    """Chunked Track class
+
+    Wraps a track that is not held in memory, such as an np.memmap of an (N, 2) array
+    of coordinates, and reads it chunk by chunk. Consecutive chunks overlap by the
+    window of the LICs minus one point (see kernels.chunk_plan), so every window of
+    consecutive points lies inside a chunk, and since the LICs hold when any window
+    meets them the result is the same as on the whole track. At most chunk_size points
+    plus the overlap are held in memory at a time.
+
+    Attributes:
+        points (array): (N, 2) array of coordinates, any array supporting len() and
+            slicing, such as an np.memmap
+        chunk_size (int): Number of points between the starts of two chunks
+    """
+
+    def __init__(self, points, chunk_size=DEFAULT_CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("chunk_size should be at least 1")
+        shape = np.shape(points)
+        if len(shape) != 2 or shape[1] != 2:
+            raise ValueError("points should be an (N, 2) array of coordinates")
+        self.points = points
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def of(cls, points, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ Wraps data points in a ChunkedTrack, unless they already are
+
+        Args:
+            points (array): (N, 2) array of coordinates, or a ChunkedTrack
+            chunk_size (int): Number of points between the starts of two chunks
+
+        Returns
+            ChunkedTrack: The data points
+        """
+        if isinstance(points, cls):
+            return points
+        return cls(points, chunk_size)
+
+    def __len__(self):
+        return len(self.points)
+
+    def chunks(self, halo):
+        """ Reads the track chunk by chunk
+
+        Args:
+            halo (int): Number of points shared by two consecutive chunks
+
+        Yields
+            ndarray: The points of each chunk, as an in-memory (M, 2) float array
+        """
+        for start, stop in kernels.chunk_plan(len(self), self.chunk_size, halo):
+            yield kernels.as_points_array(
+                np.array(self.points[start:stop], dtype=float)
+            )
@@ -0,0 +1,577 @@
+import numpy as np
+
+
+def as_points_array(points):
+    """ Converts a list of coordinates into an array of points
+
+    Args:
+        points (array): List of coordinates of data points, or an (N, 2) array
+
+    Returns
+        ndarray: The points as an (N, 2) float array
+    """
+    array = np.asarray(points, dtype=float)
+    if array.size == 0:
+        return array.reshape(0, 2)
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError("points should be a list of [x, y] coordinates")
+    return array
+
+
+def as_offsets_array(offsets, num_points):
+    """ Converts and checks the offsets of a batch of tracks
+
+    Args:
+        offsets (array): B+1 offsets, track k is points[offsets[k]:offsets[k+1]]
+        num_points (int): Total number of points of the batch
+
+    Returns
+        ndarray: The offsets as an int64 array
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if (
+        offsets.ndim != 1
+        or len(offsets) == 0
+        or offsets[0] != 0
+        or offsets[-1] != num_points
+        or np.any(np.diff(offsets) < 0)
+    ):
+        raise ValueError("offsets should increase from 0 to the number of points")
+    return offsets
+
+
+def any_per_track(met, offsets, window):
+    """ Reduces the results of windows of a batch of tracks to one result per track
+
+    Args:
+        met (ndarray): Result of each window of the batch, element j is the window of
+            consecutive points starting at point j
+        offsets (ndarray): B+1 offsets, track k is points[offsets[k]:offsets[k+1]]
+        window (int): Number of consecutive points in a window
+
+    Returns
+        ndarray: B booleans, True when a window lying inside the track is met
+    """
+    starts = np.flatnonzero(met)
+    tracks = np.searchsorted(offsets, starts, side="right") - 1
+    inside = starts + window <= offsets[tracks + 1]
+    result = np.zeros(len(offsets) - 1, dtype=bool)
+    result[tracks[inside]] = True
+    return result
+
+
+def chunk_plan(num_points, chunk_size, halo):
+    """ Splits a track into overlapping chunks
+
+    Each chunk starts chunk_size points after the previous one and overlaps the next
+    one by halo points, so that every window of at most halo + 1 consecutive points
+    lies inside a chunk. Every chunk has more than halo points, unless the whole track
+    is a single chunk.
+
+    Args:
+        num_points (int): Number of points of the track
+        chunk_size (int): Number of points between the starts of two chunks
+        halo (int): Number of points shared by two consecutive chunks
+
+    Returns
+        list: The (start, stop) range of points of each chunk
+    """
+    return [
+        (start, min(num_points, start + chunk_size + halo))
+        for start in range(0, max(num_points - halo, 1), chunk_size)
+    ]
+
+
+def consecutive_squared_distances(points):
+    """ Calculates the squared distance between each pair of consecutive points
+
+    Args:
+        points (ndarray): (N, 2) array of points
+
+    Returns
+        ndarray: The N-1 squared distances
+    """
+    dx = points[1:, 0] - points[:-1, 0]
+    dy = points[1:, 1] - points[:-1, 1]
+    dx *= dx
+    dy *= dy
+    dx += dy
+    return dx
+
+
+def x_decreases(points):
+    """ Checks whether the x coordinate decreases from each point to the next
+
+    Args:
+        points (ndarray): (N, 2) array of points
+
+    Returns
+        ndarray: N-1 booleans, True when X[i+1] - X[i] < 0
+    """
+    return points[1:, 0] < points[:-1, 0]
+
+
+def triangle_cross_products(points):
+    """ Calculates the cross product of the sides ab and ac of each triangle of three
+    consecutive points, i.e., twice its signed area
+
+    Args:
+        points (ndarray): (N, 2) array of points
+
+    Returns
+        ndarray: The N-2 cross products
+    """
+    a, b, c = points[:-2], points[1:-1], points[2:]
+    return (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (
+        c[:, 0] - a[:, 0]
+    )
+
+
+def triangle_areas(points, cross=None):
+    """ Calculates the area of each triangle of three consecutive points
+
+    This is the batch form of Triangle.area: half the absolute cross product of the
+    sides ab and ac (shoelace formula).
+
+    Args:
+        points (ndarray): (N, 2) array of points
+        cross (ndarray): The cross products, see triangle_cross_products, computed
+            when None
+
+    Returns
+        ndarray: The N-2 areas
+    """
+    if cross is None:
+        cross = triangle_cross_products(points)
+    return np.abs(cross) / 2
+
+
+def triangle_enclosing_radii_squared(points, squared_distances=None, cross=None):
+    """ Calculates the squared radius of the smallest circle containing each set of
+    three consecutive points
+
+    When the triangle has an obtuse or right angle, or is degenerate, the smallest
+    circle has the longest side as diameter. Otherwise it is the circumscribed circle,
+    whose squared radius is (|ab|^2 * |ac|^2 * |bc|^2) / (4 * cross^2), where cross is
+    twice the signed area. Only squared lengths are used.
+
+    Args:
+        points (ndarray): (N, 2) array of points
+        squared_distances (ndarray): The squared distances between consecutive
+            points, see consecutive_squared_distances, computed when None
+        cross (ndarray): The cross products, see triangle_cross_products, computed
+            when None
+
+    Returns
+        ndarray: The N-2 squared radii
+    """
+    if squared_distances is None:
+        squared_distances = consecutive_squared_distances(points)
+    if cross is None:
+        cross = triangle_cross_products(points)
+    ac = points[2:] - points[:-2]
+    sides = np.stack(
+        [
+            squared_distances[:-1],
+            ac[:, 0] ** 2 + ac[:, 1] ** 2,
+            squared_distances[1:],
+        ]
+    )
+    longest = sides.max(axis=0, initial=0)
+    diameter = (longest >= sides.sum(axis=0) - longest) | (cross == 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        circumscribed = sides.prod(axis=0) / (4 * cross * cross)
+    return np.where(diameter, longest / 4, circumscribed)
+
+
+def angles_deviate_from_pi(points, cos_epsilon):
+    """ Checks whether the angle at the middle vertex of three consecutive points
+    differs from PI by at least EPSILON
+
+    Vectorized form of decide.angle_deviates_from_pi, which compares the dot product
+    of the vectors from the vertex with -cos(EPSILON) times their lengths, using
+    squares only. The result is meaningless for coincident vertices.
+
+    Args:
+        points (ndarray): (N, 2) array of points
+        cos_epsilon (float): cos(EPSILON)
+
+    Returns
+        ndarray: N-2 booleans, True if angle <= PI - EPSILON or angle >= PI + EPSILON
+    """
+    a, b, c = points[:-2], points[1:-1], points[2:]
+    u, v = a - b, c - b
+    dot = u[:, 0] * v[:, 0] + u[:, 1] * v[:, 1]
+    bound = (cos_epsilon * cos_epsilon) * (
+        (u[:, 0] ** 2 + u[:, 1] ** 2) * (v[:, 0] ** 2 + v[:, 1] ** 2)
+    )
+    if cos_epsilon >= 0:
+        return (dot >= 0) | ((cos_epsilon > 0) & (bound >= dot * dot))
+    return (dot >= 0) & (dot * dot >= bound)
+
+
+def coincident_vertices(points):
+    """ Finds the consecutive triples whose vertex coincides with another point
+
+    Args:
+        points (ndarray): (N, 2) array of points
+
+    Returns
+        ndarray: N-2 booleans, True when the angle at the vertex is undefined
+    """
+    a, b, c = points[:-2], points[1:-1], points[2:]
+    return (a == b).all(axis=1) | (c == b).all(axis=1)
+
+
+def quadrants(points):
+    """ Determines which quadrant each point lies in
+
+    Ties are broken by quadrant number as in Point.quadrant, i.e., I, II, III, IV
+
+    Args:
+        points (ndarray): (N, 2) array of points
+
+    Returns
+        ndarray: The quadrant numbers (1-4), as int8
+    """
+    x, y = points[:, 0], points[:, 1]
+    codes = np.full(len(points), 4, dtype=np.int8)
+    codes[(x <= 0) & (y <= 0)] = 3
+    codes[(x <= 0) & (y >= 0)] = 2
+    codes[(x >= 0) & (y >= 0)] = 1
+    return codes
+
+
+def window_quadrant_counts(points, q_pts):
+    """ Counts the distinct quadrants of each set of Q_PTS consecutive points
+
+    This is a rolling histogram of the quadrants with four buckets: the histogram of
+    the window starting at point i is the difference of the running totals of the
+    quadrants at points i+Q_PTS and i, so each window costs O(1) whatever Q_PTS is.
+
+    Args:
+        points (ndarray): (N, 2) array of points
+        q_pts (int): Number of consecutive points in a window
+
+    Returns
+        ndarray: The N-Q_PTS+1 numbers of distinct quadrants
+    """
+    one_hot = quadrants(points)[:, None] == np.arange(1, 5, dtype=np.int8)
+    totals = np.zeros((len(points) + 1, 4), dtype=np.int64)
+    np.cumsum(one_hot, axis=0, out=totals[1:])
+    return (totals[q_pts:] > totals[:-q_pts]).sum(axis=1)
+
+
+def chord_distances(points, n_pts, block_size=1 << 20):
+    """ Calculates the largest distance to the chord of each N_PTS window
+
+    For each set of N_PTS consecutive points, the distance of every intermediate point
+    to the line joining the first and last points is computed from the cross product of
+    the chord and the vector to the point. When the first and last points coincide the
+    distance to the coincident point is used instead.
+
+    The windows are strided views of the points, processed in blocks of about
+    block_size intermediate points to bound the memory used.
+
+    Args:
+        points (ndarray): (N, 2) array of points
+        n_pts (int): Number of consecutive points in a window
+        block_size (int): Number of intermediate points processed at once
+
+    Returns
+        ndarray: The N-N_PTS+1 largest distances (0 when N_PTS < 3)
+    """
+    count = len(points) - n_pts + 1
+    largest = np.zeros(max(count, 0))
+    if n_pts < 3 or count <= 0:
+        return largest
+
+    # (count, 2, n_pts) view, windows[i, :, j] is point i+j
+    windows = np.lib.stride_tricks.as_strided(
+        points,
+        shape=(count, 2, n_pts),
+        strides=(points.strides[0], points.strides[1], points.strides[0]),
+        writeable=False,
+    )
+    step = max(block_size // (n_pts - 2), 1)
+    for first in range(0, count, step):
+        block = windows[first : first + step]
+        start, end = block[:, :, 0], block[:, :, -1]
+        chord = end - start
+        delta = block[:, :, 1:-1] - start[:, :, None]
+        base = np.sqrt(chord[:, 0] ** 2 + chord[:, 1] ** 2)
+        coincident = base == 0
+        cross = chord[:, 0, None] * delta[:, 1] - chord[:, 1, None] * delta[:, 0]
+        dist = np.abs(cross) / np.where(coincident, 1, base)[:, None]
+        dist[coincident] = np.sqrt(
+            delta[coincident, 0] ** 2 + delta[coincident, 1] ** 2
+        )
+        largest[first : first + step] = dist.max(axis=1)
+    return largest
+
+
+def convex_hull(points, indices):
+    """ Computes the convex hull of some of the points with Andrew's monotone chain
+
+    The vertices are returned counterclockwise, starting from the leftmost (then
+    lowest) point. Collinear and duplicate points are dropped.
+
+    Args:
+        points (ndarray): (N, 2) array of points
+        indices (ndarray): Indices of the points to compute the hull of
+
+    Returns
+        ndarray: The indices of the vertices of the hull
+    """
+    indices = np.asarray(indices)
+    order = indices[np.lexsort((points[indices, 1], points[indices, 0]))]
+    xs, ys = points[order, 0].tolist(), points[order, 1].tolist()
+
+    def chain(positions):
+        stack = []
+        for k in positions:
+            while len(stack) >= 2:
+                o, a = stack[-2], stack[-1]
+                cross = (xs[a] - xs[o]) * (ys[k] - ys[o]) - (ys[a] - ys[o]) * (
+                    xs[k] - xs[o]
+                )
+                if cross > 0:
+                    break
+                stack.pop()
+            stack.append(k)
+        return stack
+
+    lower = chain(range(len(order)))
+    upper = chain(range(len(order) - 1, -1, -1))
+    hull = lower[:-1] + upper[:-1]
+    if not hull:
+        hull = [0]
+    return order[hull]
+
+
+class HullTree:
+    """Hull Tree class
+
+    Segment tree over blocks of consecutive points, where each node stores the convex
+    hull of the points of its blocks. The point of a range of consecutive points that
+    is extreme in a given direction is a vertex of the hulls of the O(log N) nodes
+    covering the range, where it is found by a binary search on the angles of the
+    edges, plus the points of the partial blocks at both ends of the range.
+
+    Attributes:
+        points (ndarray): (N, 2) array of points
+        leaf_size (int): Number of consecutive points in a block
+        size (int): Number of leaves of the tree, a power of 2
+        hull_start (ndarray): Position of the first vertex of the hull of each node
+        hull_size (ndarray): Number of vertices of the hull of each node
+        hull_index (ndarray): Indices of the vertices of all the hulls, one after the
+            other
+        hull_angle (ndarray): Angle (-PI/2 - 3*PI/2) of the edge starting at each
+            vertex, increasing along each hull
+    """
+
+    def __init__(self, points, leaf_size=32):
+        self.points = points
+        self.leaf_size = int(leaf_size)
+        blocks = -(-len(points) // int(leaf_size))
+        self.size = 1 << max(blocks - 1, 0).bit_length()
+
+        hulls = [np.zeros(0, dtype=np.int64)] * (2 * self.size)
+        for block in range(blocks):
+            first = block * leaf_size
+            hulls[self.size + block] = convex_hull(
+                points, np.arange(first, min(first + leaf_size, len(points)))
+            )
+        for node in range(self.size - 1, 0, -1):
+            children = np.concatenate([hulls[2 * node], hulls[2 * node + 1]])
+            if len(children):
+                hulls[node] = convex_hull(points, children)
+
+        self.hull_size = np.array([len(hull) for hull in hulls], dtype=np.int64)
+        self.hull_start = np.concatenate([[0], np.cumsum(self.hull_size)[:-1]])
+        self.hull_index = np.concatenate(hulls).astype(np.int64)
+        following = np.concatenate(
+            [np.roll(hull, -1) for hull in hulls] + [np.zeros(0, dtype=np.int64)]
+        ).astype(np.int64)
+        edges = points[following] - points[self.hull_index]
+        angles = np.arctan2(edges[:, 1], edges[:, 0])
+        angles[angles <= -np.pi / 2] += 2 * np.pi
+        self.hull_angle = angles
+
+    def nodes(self, first, stop):
+        """ Decomposes ranges of consecutive points into nodes of the tree
+
+        Each range is split into its partial blocks, which are returned as ranges of
+        points, and the nodes covering its full blocks. A range without full blocks is
+        returned as a single range of points, shorter than two blocks.
+
+        Args:
+            first (ndarray): First point of each range
+            stop (ndarray): End (exclusive) of each range
+
+        Returns
+            tuple: The (first, stop) ranges of points not covered by the nodes, and a
+                list of (ranges, nodes) pairs, each range being covered by its node
+        """
+        first_block = -(-first // self.leaf_size)
+        stop_block = stop // self.leaf_size
+        full = first_block < stop_block
+        head_stop = np.where(full, first_block * self.leaf_size, stop)
+        tail_first = np.where(full, stop_block * self.leaf_size, stop)
+        partial = [(first, head_stop), (tail_first, stop)]
+
+        covered = []
+        ranges = np.flatnonzero(full)
+        left = first_block[ranges] + self.size
+        right = stop_block[ranges] + self.size
+        while len(ranges):
+            active = left < right
+            use = active & (left & 1 == 1)
+            covered.append((ranges[use], left[use]))
+            left = left + use
+            use = active & (right & 1 == 1)
+            right = right - use
+            covered.append((ranges[use], right[use]))
+            keep = (left >> 1) < (right >> 1)
+            ranges, left, right = ranges[keep], left[keep] >> 1, right[keep] >> 1
+        return partial, covered
+
+    def extreme_points(self, first, stop, directions):
+        """ Finds the point of each range that is the farthest in a direction
+
+        Args:
+            first (ndarray): First point of each range
+            stop (ndarray): End (exclusive) of each range, ranges must not be empty
+            directions (ndarray): (R, 2) array of directions
+
+        Returns
+            ndarray: The index of a point of each range maximizing the dot product
+                with its direction
+        """
+        best = np.full(len(first), -np.inf)
+        best_index = first.copy()
+
+        def update(ranges, candidates):
+            values = (
+                directions[ranges, 0] * self.points[candidates, 0]
+                + directions[ranges, 1] * self.points[candidates, 1]
+            )
+            better = values > best[ranges]
+            best[ranges[better]] = values[better]
+            best_index[ranges[better]] = candidates[better]
+
+        partial, covered = self.nodes(first, stop)
+        for head, tail in partial:
+            for offset in range(2 * self.leaf_size):
+                ranges = np.flatnonzero(head + offset < tail)
+                if len(ranges) == 0:
+                    break
+                update(ranges, head[ranges] + offset)
+
+        targets = np.arctan2(directions[:, 1], directions[:, 0]) + np.pi / 2
+        targets[targets > 3 * np.pi / 2] -= 2 * np.pi
+        last = len(self.hull_angle) - 1
+        for ranges, nodes in covered:
+            start = self.hull_start[nodes]
+            count = self.hull_size[nodes]
+            low, high = start, start + count
+            while True:
+                active = low < high
+                if not active.any():
+                    break
+                middle = np.minimum((low + high) // 2, last)
+                below = self.hull_angle[middle] < targets[ranges]
+                low = np.where(active & below, middle + 1, low)
+                high = np.where(active & ~below, middle, high)
+            # The neighbours are checked too, in case of rounding in the angles
+            for shift in (-1, 0, 1):
+                vertices = start + (low - start + shift) % count
+                update(ranges, self.hull_index[vertices])
+        return best_index
+
+    def farthest_points(self, first, stop, centers):
+        """ Finds the point of each range that is the farthest from a center
+
+        The farthest point of a range is a vertex of the hulls covering it, so all
+        these vertices are examined.
+
+        Args:
+            first (ndarray): First point of each range
+            stop (ndarray): End (exclusive) of each range, ranges must not be empty
+            centers (ndarray): (R, 2) array of centers
+
+        Returns
+            ndarray: The distance from each center to the farthest point of its range
+        """
+        best = np.zeros(len(first))
+
+        def update(ranges, candidates):
+            delta = self.points[candidates] - centers[ranges]
+            np.maximum.at(best, ranges, np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2))
+
+        partial, covered = self.nodes(first, stop)
+        for head, tail in partial:
+            for offset in range(2 * self.leaf_size):
+                ranges = np.flatnonzero(head + offset < tail)
+                if len(ranges) == 0:
+                    break
+                update(ranges, head[ranges] + offset)
+        for ranges, nodes in covered:
+            count = self.hull_size[nodes]
+            repeated = np.repeat(np.arange(len(ranges)), count)
+            positions = np.arange(len(repeated)) - np.repeat(
+                np.cumsum(count) - count, count
+            )
+            update(
+                ranges[repeated],
+                self.hull_index[self.hull_start[nodes][repeated] + positions],
+            )
+        return best
+
+
+def chord_distances_hull(points, n_pts, leaf_size=32):
+    """ Calculates the largest distance to the chord of each N_PTS window using hulls
+
+    Gives the same result as chord_distances. The intermediate point farthest from the
+    line joining the first and last points of a window is one of the two points of the
+    window that are extreme in the direction perpendicular to that line, which are
+    found with a HullTree in O(log^2 N) instead of examining the N_PTS points. When
+    the first and last points coincide, the distance to the farthest intermediate
+    point is used as in chord_distances.
+
+    Args:
+        points (ndarray): (N, 2) array of points
+        n_pts (int): Number of consecutive points in a window
+        leaf_size (int): Number of consecutive points in a block of the HullTree
+
+    Returns
+        ndarray: The N-N_PTS+1 largest distances (0 when N_PTS < 3)
+    """
+    count = len(points) - n_pts + 1
+    largest = np.zeros(max(count, 0))
+    if n_pts < 3 or count <= 0:
+        return largest
+
+    tree = HullTree(points, leaf_size)
+    start, end = points[:count], points[n_pts - 1 :]
+    chord = end - start
+    base = np.sqrt(chord[:, 0] ** 2 + chord[:, 1] ** 2)
+    coincident = base == 0
+    first = np.arange(1, count + 1)
+    stop = first + n_pts - 2
+
+    windows = np.flatnonzero(~coincident)
+    normal = np.stack([-chord[windows, 1], chord[windows, 0]], axis=1)
+    for direction in (normal, -normal):
+        farthest = tree.extreme_points(first[windows], stop[windows], direction)
+        delta = points[farthest] - start[windows]
+        cross = chord[windows, 0] * delta[:, 1] - chord[windows, 1] * delta[:, 0]
+        dist = np.abs(cross) / base[windows]
+        largest[windows] = np.maximum(largest[windows], dist)
+
+    windows = np.flatnonzero(coincident)
+    if len(windows):
+        largest[windows] = tree.farthest_points(
+            first[windows], stop[windows], start[windows]
+        )
+    return largest
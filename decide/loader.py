@@ -0,0 +1,211 @@
+import json
+
+import numpy as np
+
+# Brackets and commas of a JSON list of coordinates, read as whitespace
+_SEPARATORS = str.maketrans("[],", "   ")
+
+
+def read_jsonl(source, block_size=1 << 20):
+    """ Reads a JSON Lines file of tracks, block by block
+
+    Each line holds a track: either a list of [x, y] coordinates, or an object with the
+    coordinates under "points", whose other members are kept as the metadata of the
+    track. The lines are read in blocks of about block_size characters, and the
+    coordinates of a whole block are parsed at once by numpy instead of building a
+    Python list per point.
+
+    Args:
+        source (str): Path of the JSON Lines file
+        block_size (int): Number of characters read at a time
+
+    Yields
+        tuple: The (P, 2) points and the B+1 offsets of the tracks of a block, as for
+            Decide.decide_many, and the metadata of each track (None for none)
+    """
+    with open(source) as f:
+        while True:
+            lines = f.readlines(block_size)
+            if not lines:
+                return
+            yield _parse_jsonl_block(lines)
+
+
+def _parse_jsonl_block(lines):
+    # The coordinates of the lists are parsed from the text of the whole block, and
+    # those of the objects, which json has already parsed, are converted at once
+    texts = []
+    pairs = []
+    metadata = []
+    counts = []
+    in_texts = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            track = json.loads(line)
+            points = track.pop("points")
+            metadata.append(track)
+            pairs.extend(points)
+            counts.append(len(points))
+            in_texts.append(False)
+        else:
+            metadata.append(None)
+            texts.append(line)
+            # A list of n points has 2n - 1 commas
+            counts.append((line.count(",") + 1) // 2)
+            in_texts.append(True)
+    counts = np.array(counts, dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    in_text = np.repeat(np.array(in_texts, dtype=bool), counts)
+    values = _parse_numbers(" ".join(texts).translate(_SEPARATORS), " ")
+    if len(values) != 2 * np.count_nonzero(in_text):
+        raise ValueError("tracks should be lists of [x, y] coordinates")
+    points = np.empty((offsets[-1], 2))
+    points[in_text] = values.reshape(-1, 2)
+    points[~in_text] = _parse_pairs(pairs)
+    return points, offsets, metadata
+
+
+def read_csv(source, block_size=1 << 20):
+    """ Reads a CSV file of points, block by block
+
+    The CSV file has a header with at least the columns track, x and y, and one row
+    per point. Consecutive rows with the same track identifier form a track, and the
+    identifier is kept as the metadata of the track. The rows are read in blocks of
+    about block_size characters; the rows of the last track of a block are carried
+    over to the next block, since it may go on there. So a track is only held in
+    memory whole, and memory is bounded by the block size plus the longest track.
+
+    The rows are split on commas, and spaces around the fields are ignored. Quoted
+    fields are not supported.
+
+    Args:
+        source (str): Path of the CSV file
+        block_size (int): Number of characters read at a time
+
+    Yields
+        tuple: The (P, 2) points and the B+1 offsets of the tracks of a block, as for
+            Decide.decide_many, and the metadata of each track
+    """
+    with open(source, newline="") as f:
+        header = f.readline()
+        _check_unquoted(header)
+        columns = [name.strip() for name in header.split(",")]
+        if not {"track", "x", "y"} <= set(columns):
+            raise ValueError("%s should have track, x and y columns" % source)
+        track, x, y = (columns.index(name) for name in ("track", "x", "y"))
+        # Identifier and chunks of points of the track carried over
+        carried_id, carried_points, num_carried = None, [], 0
+        while True:
+            lines = f.readlines(block_size)
+            ids, points = _parse_csv_block(lines, len(columns), track, x, y)
+            # Tracks start where the identifier changes, counted from the first
+            # carried point; only the new rows are compared
+            starts = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+            if num_carried and len(ids) and ids[0] != carried_id:
+                starts = np.concatenate([[0], starts])
+            starts = starts.astype(np.int64) + num_carried
+            if lines:
+                # The last track may go on in the next block
+                stop = starts[-1] if len(starts) else 0
+                starts = starts[:-1]
+            else:
+                stop = num_carried + len(ids)
+            if stop:
+                offsets = np.concatenate([[0], starts, [stop]]).astype(np.int64)
+                # Only the first track can start in the carried rows
+                first_id = carried_id if num_carried else ids[0]
+                metadata = [{"track": str(first_id)}] + [
+                    {"track": str(ids[k])} for k in starts - num_carried
+                ]
+                first = stop - num_carried
+                points_out = np.concatenate(carried_points + [points[:first]])
+                yield points_out, offsets, metadata
+                ids, points = ids[first:], points[first:]
+                carried_id, carried_points, num_carried = None, [], 0
+            if not lines:
+                return
+            if len(ids):
+                if not num_carried:
+                    carried_id = ids[0]
+                carried_points.append(points)
+                num_carried += len(points)
+
+
+def _parse_csv_block(lines, num_columns, track, x, y):
+    # The fields of all the rows are split at once, and each column is a slice
+    text = "".join(line for line in lines if not line.isspace())
+    if not text:
+        return np.array([], dtype=str), np.zeros((0, 2))
+    _check_unquoted(text)
+    fields = text.replace("\r", "").rstrip("\n").replace("\n", ",").split(",")
+    if len(fields) % num_columns:
+        raise ValueError("rows should have %d fields" % num_columns)
+    points = np.empty((len(fields) // num_columns, 2))
+    points[:, 0] = np.array(fields[x::num_columns], dtype=float)
+    points[:, 1] = np.array(fields[y::num_columns], dtype=float)
+    return np.char.strip(np.array(fields[track::num_columns])), points
+
+
+def _check_unquoted(text):
+    if '"' in text:
+        raise ValueError("quoted CSV fields are not supported")
+
+
+def read_tracks(source, block_size=1 << 20):
+    """ Reads the tracks of a JSON Lines or CSV file one at a time
+
+    The format is given by the extension of the file, .csv for CSV and JSON Lines
+    otherwise. The file is still parsed block by block, see read_jsonl and read_csv.
+
+    Args:
+        source (str): Path of the file
+        block_size (int): Number of characters read at a time
+
+    Yields
+        tuple: The (N, 2) points of a track and its metadata
+    """
+    read = read_csv if str(source).endswith(".csv") else read_jsonl
+    for points, offsets, metadata in read(source, block_size):
+        for k, item in enumerate(metadata):
+            yield points[offsets[k] : offsets[k + 1]], item
+
+
+def decide_file(decider, source, block_size=1 << 20):
+    """ Computes the launch decisions of the tracks of a JSON Lines or CSV file
+
+    Each block of the file is evaluated with Decide.decide_many as soon as it is
+    parsed, so that only one block is held in memory at a time.
+
+    Args:
+        decider (Decide): Decide instance with the parameters, LCM and PUV
+        source (str): Path of the file, see read_tracks
+        block_size (int): Number of characters read at a time
+
+    Yields
+        tuple: The launch decisions of the tracks of a block, and their metadata
+    """
+    read = read_csv if str(source).endswith(".csv") else read_jsonl
+    for points, offsets, metadata in read(source, block_size):
+        yield decider.decide_many(points, offsets), metadata
+
+
+def _parse_pairs(pairs):
+    if not pairs:
+        return np.zeros((0, 2))
+    try:
+        values = np.array(pairs, dtype=float)
+    except (TypeError, ValueError):
+        values = None
+    if values is None or values.shape != (len(pairs), 2):
+        raise ValueError("tracks should be lists of [x, y] coordinates")
+    return values
+
+
+def _parse_numbers(text, separator):
+    if not text.strip():
+        return np.zeros(0)
+    return np.fromstring(text, sep=separator)
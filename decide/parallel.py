@@ -0,0 +1,356 @@
+import multiprocessing
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8, ParallelDecide is not available
+    shared_memory = None
+
+import numpy as np
+
+from . import kernels
+from .decide import (
+    ALL_LICS_MASK,
+    IMPLEMENTED_LICS,
+    NUMBER_OF_LICS,
+    Decide,
+    VectorizedLaunchInterceptorConditions,
+    decode_vector,
+    encode_vector,
+)
+
+# Decide instance of a worker process, set once by _initialize_worker
+_decider = None
+
+
+def _initialize_worker(decider):
+    global _decider
+    _decider = decider
+
+
+def _decide_chunk(task):
+    """ Computes the launch decisions of a chunk of tracks in a worker process
+
+    The points, the offsets and the decisions are arrays in shared memory, so only
+    their names and the range of tracks are sent to the worker.
+    """
+    buffers, num_points, num_tracks, first, stop = task
+    points_buffer, offsets_buffer, decisions_buffer = [
+        shared_memory.SharedMemory(name=name) for name in buffers
+    ]
+    try:
+        points = np.ndarray((num_points, 2), dtype=float, buffer=points_buffer.buf)
+        offsets = np.ndarray(num_tracks + 1, dtype=np.int64, buffer=offsets_buffer.buf)
+        decisions = np.ndarray(num_tracks, dtype=bool, buffer=decisions_buffer.buf)
+        chunk_offsets = offsets[first : stop + 1]
+        decisions[first:stop] = _decider.decide_many(
+            points[chunk_offsets[0] : chunk_offsets[-1]],
+            chunk_offsets - chunk_offsets[0],
+        )
+        del points, offsets, decisions, chunk_offsets
+    finally:
+        for buffer in (points_buffer, offsets_buffer, decisions_buffer):
+            buffer.close()
+    return first, stop
+
+
+def _conditions_met_chunk(task):
+    """ Computes the CMV of a chunk of a track in a worker process
+
+    The LICs that are already met, as recorded in the shared state, are not evaluated,
+    and nothing is evaluated once the shared state is marked as settled.
+    """
+    buffers, num_points, start, stop, lics = task
+    points_buffer, state_buffer = [
+        shared_memory.SharedMemory(name=name) for name in buffers
+    ]
+    try:
+        state = np.ndarray(2, dtype=np.uint16, buffer=state_buffer.buf)
+        latched, settled = int(state[0]), bool(state[1])
+        del state
+        pending = [i for i in lics if not latched >> i & 1]
+        if settled or not pending:
+            return 0
+        points = np.ndarray((num_points, 2), dtype=float, buffer=points_buffer.buf)
+        conditions = VectorizedLaunchInterceptorConditions(
+            _decider.parameters, _decider.lic.hull_n_pts
+        )
+        cmv = conditions.get_conditions_met_vector(points[start:stop], pending)
+        del points
+        return encode_vector(cmv)
+    finally:
+        for buffer in (points_buffer, state_buffer):
+            buffer.close()
+
+
+class ParallelDecide:
+    """Parallel Decide class
+
+    Computes the launch decisions of batches of tracks with a pool of worker
+    processes. The Decide instance, with its compiled LCM and PUV, is sent once to
+    each worker when the pool starts. For each batch, the points, the offsets and the
+    decisions are placed in shared memory, which the workers read and write without
+    copying, and each worker evaluates chunks of consecutive tracks with
+    Decide.decide_many.
+
+    A single huge track can also be split into chunks of consecutive points, see
+    get_conditions_met_vector and decide_track.
+
+    The pool is started on first use and is shut down by close(), or at the end of a
+    with block.
+
+    The shared memory needs Python 3.8 or later.
+
+    Attributes:
+        decider (Decide): Decide instance with the parameters, LCM and PUV
+        workers (int): Number of worker processes, the number of CPUs by default
+        chunk_size (int): Number of tracks sent to a worker at a time
+        track_chunk_size (int): Number of points of a single track sent to a worker at
+            a time, in addition to the overlap with the next chunk
+        ordered (bool): Deliver the chunks in the order of the tracks, rather than as
+            soon as they are computed
+    """
+
+    def __init__(
+        self,
+        parameters,
+        lcm,
+        puv,
+        workers=None,
+        chunk_size=1024,
+        ordered=True,
+        hull_n_pts=None,
+        track_chunk_size=1 << 20,
+    ):
+        if shared_memory is None:
+            raise RuntimeError("ParallelDecide needs Python 3.8 or later")
+        if chunk_size < 1 or track_chunk_size < 1:
+            raise ValueError("chunk_size should be at least 1")
+        if workers is not None and workers < 1:
+            raise ValueError("workers should be at least 1")
+        self.decider = Decide(parameters, lcm, puv, hull_n_pts=hull_n_pts)
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.ordered = ordered
+        self.track_chunk_size = track_chunk_size
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Shuts down the worker processes
+
+        The pool is started again if the instance is used afterwards.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def decide_many(self, points, offsets=None):
+        """ Computes the launch decisions of a batch of tracks
+
+        Args:
+            points (ndarray): (B, N, 2) array of tracks, or (P, 2) array of points
+            offsets (array): B+1 offsets for a ragged batch, track k is
+                points[offsets[k]:offsets[k+1]]
+
+        Returns
+            ndarray: The B launch decisions
+        """
+        points, offsets = self._flatten(points, offsets)
+        decisions = np.zeros(len(offsets) - 1, dtype=bool)
+        for first, stop, chunk in self._run(points, offsets):
+            decisions[first:stop] = chunk
+        return decisions
+
+    def iter_decisions(self, points, offsets=None):
+        """ Computes the launch decisions of a batch of tracks, chunk by chunk
+
+        The chunks are delivered in the order of the tracks when ordered is True, and
+        as soon as they are computed otherwise.
+
+        Args:
+            points (ndarray): (B, N, 2) array of tracks, or (P, 2) array of points
+            offsets (array): B+1 offsets for a ragged batch, track k is
+                points[offsets[k]:offsets[k+1]]
+
+        Yields
+            tuple: The first track of the chunk, the end (exclusive) of the chunk, and
+                the launch decisions of its tracks
+        """
+        points, offsets = self._flatten(points, offsets)
+        yield from self._run(points, offsets)
+
+    def get_conditions_met_vector(self, points, lics=None):
+        """ Gets the Conditions Met Vector of a single track, in parallel
+
+        The track is split into chunks that overlap by the largest window of the LICs
+        minus one point (see kernels.chunk_plan), so that no window is lost, and the
+        CMVs of the chunks are OR'ed. Once all the LICs are met, the remaining chunks
+        are skipped.
+
+        Args:
+            points (array): List of coordinates of data points, or an (N, 2) array
+            lics (iterable): Indices of the LICs to evaluate, the other elements of the
+                CMV are left False. All the LICs are evaluated by default
+
+        Returns
+            list: The Conditions Met Vector
+        """
+        if lics is None:
+            lics = IMPLEMENTED_LICS
+        lics = [i for i in lics if i in IMPLEMENTED_LICS]
+        wanted = encode_vector(i in lics for i in range(NUMBER_OF_LICS))
+        return decode_vector(
+            self._latch(points, lics, lambda cmv_code: cmv_code & wanted == wanted)
+        )
+
+    def decide_track(self, points):
+        """ Computes the launch decision of a single track, in parallel
+
+        Only the relevant LICs are evaluated, on overlapping chunks of the track as in
+        get_conditions_met_vector, and the remaining chunks are skipped as soon as the
+        decision is launch.
+
+        Args:
+            points (array): List of coordinates of data points, or an (N, 2) array
+
+        Returns
+            bool: The launch decision
+        """
+        decider = self.decider
+        lics = [i for i in decider.relevant_lics if i in IMPLEMENTED_LICS]
+
+        def launch(cmv_code):
+            return decider.compute_final_unlocking_code(cmv_code) == ALL_LICS_MASK
+
+        return launch(self._latch(points, lics, launch))
+
+    def _latch(self, points, lics, settled):
+        points = np.ascontiguousarray(kernels.as_points_array(points))
+        for i in lics:
+            self.decider.lic.check_parameters(i, len(points))
+        halo = max([self.decider.lic.window_size(i) for i in lics] + [1]) - 1
+        if not lics or settled(0):
+            return 0
+
+        buffers = [_shared_copy(points), _shared_copy(np.zeros(2, dtype=np.uint16))]
+        names = tuple(buffer.name for buffer in buffers)
+        tasks = [
+            (names, len(points), start, stop, lics)
+            for start, stop in kernels.chunk_plan(
+                len(points), self.track_chunk_size, halo
+            )
+        ]
+        state = np.ndarray(2, dtype=np.uint16, buffer=buffers[1].buf)
+        cmv_code = 0
+        results = None
+        try:
+            results = self._get_pool().imap_unordered(_conditions_met_chunk, tasks)
+            for chunk_code in results:
+                cmv_code |= chunk_code
+                state[0] = cmv_code
+                if settled(cmv_code):
+                    # The chunks that are still queued return without evaluating
+                    state[1] = 1
+            return cmv_code
+        finally:
+            # As in _run, the chunks still queued or running use the shared memory
+            if results is not None:
+                state[1] = 1
+                _drain(results)
+            del state
+            for buffer in buffers:
+                buffer.close()
+                buffer.unlink()
+
+    def _run(self, points, offsets):
+        num_tracks = len(offsets) - 1
+        buffers = [
+            _shared_copy(points),
+            _shared_copy(offsets),
+            _shared_copy(np.zeros(num_tracks, dtype=bool)),
+        ]
+        names = tuple(buffer.name for buffer in buffers)
+        tasks = [
+            (
+                names,
+                len(points),
+                num_tracks,
+                first,
+                min(first + self.chunk_size, num_tracks),
+            )
+            for first in range(0, num_tracks, self.chunk_size)
+        ]
+        decisions = np.ndarray(num_tracks, dtype=bool, buffer=buffers[2].buf)
+        results = None
+        try:
+            pool = self._get_pool()
+            if self.ordered:
+                results = pool.imap(_decide_chunk, tasks)
+            else:
+                results = pool.imap_unordered(_decide_chunk, tasks)
+            for first, stop in results:
+                yield first, stop, decisions[first:stop].copy()
+        finally:
+            # The chunks still queued or running use the shared memory, so they are
+            # waited for before it is unlinked, when the caller stops early or fails
+            if results is not None:
+                _drain(results)
+            del decisions
+            for buffer in buffers:
+                buffer.close()
+                buffer.unlink()
+
+    def _flatten(self, points, offsets):
+        points = np.asarray(points, dtype=float)
+        if offsets is None:
+            if points.ndim != 3 or points.shape[2] != 2:
+                raise ValueError("tracks should be a (B, N, 2) array")
+            num_tracks, num_points = points.shape[:2]
+            offsets = np.arange(num_tracks + 1) * num_points
+            points = points.reshape(-1, 2)
+        points = kernels.as_points_array(points)
+        offsets = kernels.as_offsets_array(offsets, len(points))
+        return np.ascontiguousarray(points), offsets
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.workers, initializer=_initialize_worker, initargs=(self.decider,)
+            )
+        return self._pool
+
+
+def _drain(results):
+    """ Waits for the remaining results of an imap, ignoring their errors
+
+    Args:
+        results (iterator): The iterator returned by Pool.imap or Pool.imap_unordered
+    """
+    while True:
+        try:
+            next(results)
+        except StopIteration:
+            return
+        except Exception:
+            pass
+
+
+def _shared_copy(array):
+    """ Copies an array into a new block of shared memory
+
+    Args:
+        array (ndarray): The array
+
+    Returns
+        SharedMemory: The block of shared memory, to be closed and unlinked
+    """
+    buffer = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=buffer.buf)[...] = array
+    return buffer
@@ -0,0 +1,205 @@
+import os
+
+import numpy as np
+
+from .decide import ALL_LICS_MASK, NUMBER_OF_LICS, decode_vectors, encode_vectors
+
+CMV_FILE = "cmv.u16"
+FUV_FILE = "fuv.u16"
+DECISIONS_FILE = "decisions.bits"
+# Number of bits set in each byte
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+class ResultWriter:
+    """Result Writer class
+
+    Writes the results of batches of tracks as bit-packed columns, in a directory with
+    one file per column:
+
+    - cmv.u16: the CMV of each track encoded as a little-endian uint16 (see
+      encode_vector)
+    - fuv.u16: the FUV of each track encoded the same way
+    - decisions.bits: the launch decisions, one bit per track, least significant bit
+      first (see np.packbits)
+
+    So a track takes 4 bytes and 1 bit, instead of lists of booleans or the PUM. The
+    batches are appended to the files as they come, and a directory that already holds
+    results is appended to. Each column can be memory-mapped, see ResultReader.
+
+    Attributes:
+        path (str): Path of the directory
+        num_tracks (int): Number of tracks written so far
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        for name in (CMV_FILE, FUV_FILE, DECISIONS_FILE):
+            open(os.path.join(path, name), "ab").close()
+        self.num_tracks = _num_codes(os.path.join(path, CMV_FILE))
+        if _num_codes(os.path.join(path, FUV_FILE)) != self.num_tracks:
+            raise ValueError("%s has columns of different lengths" % path)
+
+    def append(self, cmv_codes, fuv_codes, decisions):
+        """ Writes the results of a batch of tracks
+
+        Args:
+            cmv_codes (array): CMV code of each track
+            fuv_codes (array): FUV code of each track
+            decisions (array): Launch decision of each track
+        """
+        cmv_codes = np.asarray(cmv_codes, dtype="<u2").ravel()
+        fuv_codes = np.asarray(fuv_codes, dtype="<u2").ravel()
+        decisions = np.asarray(decisions, dtype=bool).ravel()
+        if not len(cmv_codes) == len(fuv_codes) == len(decisions):
+            raise ValueError("the columns should have one element per track")
+        self._append_decisions(decisions)
+        with open(os.path.join(self.path, FUV_FILE), "ab") as f:
+            f.write(fuv_codes.tobytes())
+        # The CMV column gives the number of tracks, so it is written last
+        with open(os.path.join(self.path, CMV_FILE), "ab") as f:
+            f.write(cmv_codes.tobytes())
+        self.num_tracks += len(cmv_codes)
+
+    def _append_decisions(self, decisions):
+        with open(os.path.join(self.path, DECISIONS_FILE), "r+b") as f:
+            # The last byte is completed when it holds less than 8 decisions
+            f.seek(self.num_tracks // 8)
+            used = self.num_tracks % 8
+            if used:
+                last = np.frombuffer(f.read(1), dtype=np.uint8)
+                first = np.unpackbits(last, count=used, bitorder="little")
+                decisions = np.concatenate([first.astype(bool), decisions])
+                f.seek(self.num_tracks // 8)
+            f.write(np.packbits(decisions, bitorder="little").tobytes())
+
+    def record(self, decider, points, offsets=None):
+        """ Computes and writes the results of a batch of tracks
+
+        The whole CMV of each track is written, so every implemented LIC is evaluated
+        and its parameters are checked, including the LICs that cannot change the
+        decision and that Decide.decide_many skips. This costs more than computing the
+        decisions alone, and parameters that are out of range for such a LIC raise a
+        ValueError here but not in Decide.decide_many. The decisions are the same.
+
+        Args:
+            decider (Decide): Decide instance with the parameters, LCM and PUV
+            points (ndarray): (B, N, 2) array of tracks, or (P, 2) array of points
+            offsets (array): B+1 offsets for a ragged batch, track k is
+                points[offsets[k]:offsets[k+1]]
+
+        Returns
+            ndarray: The B launch decisions
+        """
+        decisions, cmvs = decider.decide_many(points, offsets, return_cmv=True)
+        cmv_codes = encode_vectors(cmvs)
+        self.append(
+            cmv_codes, decider.compute_final_unlocking_codes(cmv_codes), decisions
+        )
+        return decisions
+
+
+class ResultReader:
+    """Result Reader class
+
+    Reads the columns written by ResultWriter. The columns are memory-mapped, so
+    opening the results is immediate and only the parts that are used are read.
+
+    Attributes:
+        path (str): Path of the directory
+        cmv_codes (ndarray): Memory-mapped CMV code of each track
+        fuv_codes (ndarray): Memory-mapped FUV code of each track
+        packed_decisions (ndarray): Memory-mapped launch decisions, 8 tracks per byte
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.cmv_codes = _map(os.path.join(path, CMV_FILE), "<u2")
+        self.fuv_codes = _map(os.path.join(path, FUV_FILE), "<u2")
+        self.packed_decisions = _map(os.path.join(path, DECISIONS_FILE), np.uint8)
+        num_tracks = len(self.cmv_codes)
+        if (
+            len(self.fuv_codes) != num_tracks
+            or len(self.packed_decisions) != (num_tracks + 7) // 8
+        ):
+            raise ValueError("%s has columns of different lengths" % path)
+
+    def __len__(self):
+        return len(self.cmv_codes)
+
+    @property
+    def decisions(self):
+        """ Unpacks the launch decisions
+
+        Returns
+            ndarray: The launch decision of each track
+        """
+        return np.unpackbits(
+            self.packed_decisions, count=len(self), bitorder="little"
+        ).astype(bool)
+
+    def cmvs(self, tracks=slice(None)):
+        """ Decodes the CMVs of some tracks
+
+        Args:
+            tracks (slice): The tracks, all of them by default
+
+        Returns
+            ndarray: (B, NUMBER_OF_LICS) array of booleans
+        """
+        return decode_vectors(self.cmv_codes[tracks])
+
+    def fuvs(self, tracks=slice(None)):
+        """ Decodes the FUVs of some tracks
+
+        Args:
+            tracks (slice): The tracks, all of them by default
+
+        Returns
+            ndarray: (B, NUMBER_OF_LICS) array of booleans
+        """
+        return decode_vectors(self.fuv_codes[tracks])
+
+    def count_launches(self):
+        """ Counts the launch decisions, without unpacking them
+
+        Returns
+            int: Number of tracks whose decision is launch
+        """
+        return int(_POPCOUNT[self.packed_decisions].sum(dtype=np.int64))
+
+    def count_conditions_met(self, block_size=1 << 20):
+        """ Counts the tracks that meet each LIC
+
+        The CMV codes are decoded block by block.
+
+        Args:
+            block_size (int): Number of tracks decoded at a time
+
+        Returns
+            ndarray: Number of tracks that meet each LIC
+        """
+        counts = np.zeros(NUMBER_OF_LICS, dtype=np.int64)
+        for first in range(0, len(self), block_size):
+            counts += self.cmvs(slice(first, first + block_size)).sum(axis=0)
+        return counts
+
+    def check(self):
+        """ Checks that the decisions agree with the FUVs
+
+        Returns
+            bool: True if the decision of each track is launch exactly when all the
+                elements of its FUV are true
+        """
+        return bool(np.array_equal(self.decisions, self.fuv_codes == ALL_LICS_MASK))
+
+
+def _num_codes(path):
+    return os.path.getsize(path) // 2
+
+
+def _map(path, dtype):
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype, "r")
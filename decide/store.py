@@ -0,0 +1,317 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from . import kernels
+from . import loader
+
+MAGIC = b"DECIDETR"
+VERSION = 1
+# Magic, version, size of a coordinate, number of tracks, number of points and size
+# of the metadata, padded to HEADER_SIZE bytes
+HEADER = struct.Struct("<8sIIQQQ")
+HEADER_SIZE = 64
+DTYPES = {4: np.dtype("<f4"), 8: np.dtype("<f8")}
+
+
+class TrackStoreWriter:
+    """Track Store Writer class
+
+    Writes tracks to a binary track store, see TrackStore. The coordinates are written
+    as the tracks are appended, and the offsets and the metadata when the writer is
+    closed, so the tracks do not need to be held in memory.
+
+    The store is written to a temporary file next to path, which only replaces path
+    when the writer is closed. When the writer is used as a context manager and an
+    exception is raised, the temporary file is deleted and path is left untouched.
+
+    Attributes:
+        path (str): Path of the store
+        dtype (dtype): Type of the coordinates, float64 or float32
+        num_tracks (int): Number of tracks written so far
+        num_points (int): Number of points written so far
+    """
+
+    def __init__(self, path, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        if dtype.kind != "f" or dtype.itemsize not in DTYPES:
+            raise ValueError("coordinates should be float64 or float32")
+        self.path = path
+        self.dtype = DTYPES[dtype.itemsize]
+        self.num_tracks = 0
+        self.num_points = 0
+        self._offsets = [0]
+        self._metadata = []
+        self._temp_path = path + ".partial"
+        self._file = open(self._temp_path, "wb")
+        self._file.write(bytes(HEADER_SIZE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def append(self, points, metadata=None):
+        """ Writes a track
+
+        Args:
+            points (array): List of coordinates of data points, or an (N, 2) array
+            metadata (dict): Metadata of the track, serializable to JSON
+        """
+        self.extend(points, [0, len(points)], [metadata])
+
+    def extend(self, points, offsets, metadata=None):
+        """ Writes a batch of tracks
+
+        Args:
+            points (ndarray): (P, 2) array with the points of all the tracks
+            offsets (array): B+1 offsets, track k is points[offsets[k]:offsets[k+1]]
+            metadata (list): Metadata of each track, or None
+        """
+        points = kernels.as_points_array(points)
+        offsets = kernels.as_offsets_array(offsets, len(points))
+        num_tracks = len(offsets) - 1
+        if metadata is None:
+            metadata = [None] * num_tracks
+        if len(metadata) != num_tracks:
+            raise ValueError("metadata should have one element per track")
+        chunk = points[offsets[0] : offsets[-1]]
+        self._file.write(np.ascontiguousarray(chunk, dtype=self.dtype).tobytes())
+        self._offsets.extend((offsets[1:] - offsets[0] + self.num_points).tolist())
+        self._metadata.extend(metadata)
+        self.num_tracks += num_tracks
+        self.num_points += len(chunk)
+
+    def discard(self):
+        """ Closes and deletes the temporary file, without writing the store"""
+        if self._file.closed:
+            return
+        self._file.close()
+        os.remove(self._temp_path)
+
+    def close(self):
+        """ Writes the offsets, the metadata and the header, and closes the store"""
+        if self._file.closed:
+            return
+        self._file.write(np.array(self._offsets, dtype="<i8").tobytes())
+        metadata = b""
+        if any(item is not None for item in self._metadata):
+            metadata = json.dumps(self._metadata).encode()
+        self._file.write(metadata)
+        self._file.seek(0)
+        self._file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                self.dtype.itemsize,
+                self.num_tracks,
+                self.num_points,
+                len(metadata),
+            )
+        )
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+
+class TrackStore:
+    """Track Store class
+
+    Binary container for a large number of tracks, read without parsing or copying.
+    The file holds a header, the coordinates of all the points as one contiguous
+    (P, 2) float64 or float32 blob, the B+1 int64 offsets of the tracks in that blob,
+    and optional JSON metadata with one element per track.
+
+    The coordinates and the offsets are memory-mapped, so opening a store is
+    immediate, track k is a view of the blob, and the whole store can be given to
+    Decide.decide_many as a ragged batch.
+
+    Attributes:
+        path (str): Path of the store
+        points (ndarray): Memory-mapped (P, 2) array with the points of all the tracks
+        offsets (ndarray): Memory-mapped B+1 offsets, track k is
+            points[offsets[k]:offsets[k+1]]
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[: len(MAGIC)] != MAGIC:
+            raise ValueError("%s is not a track store" % path)
+        magic, version, itemsize, num_tracks, num_points, metadata_size = HEADER.unpack(
+            header[: HEADER.size]
+        )
+        if version != VERSION or itemsize not in DTYPES:
+            raise ValueError("unsupported track store version %d" % version)
+        dtype = DTYPES[itemsize]
+        offsets_start = HEADER_SIZE + num_points * 2 * itemsize
+        self._metadata_start = offsets_start + (num_tracks + 1) * 8
+        self._metadata_size = metadata_size
+        self._metadata = None
+        if num_points:
+            self.points = np.memmap(
+                path, dtype, "r", offset=HEADER_SIZE, shape=(num_points, 2)
+            )
+        else:
+            self.points = np.zeros((0, 2), dtype=dtype)
+        self.offsets = np.memmap(
+            path, "<i8", "r", offset=offsets_start, shape=(num_tracks + 1,)
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("track index out of range")
+        return self.points[self.offsets[k] : self.offsets[k + 1]]
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    @property
+    def metadata(self):
+        """ Gets the metadata of the tracks
+
+        The metadata is only read the first time it is needed.
+
+        Returns
+            list: The metadata of each track, None for the tracks that have none
+        """
+        if self._metadata is None:
+            if self._metadata_size:
+                with open(self.path, "rb") as f:
+                    f.seek(self._metadata_start)
+                    self._metadata = json.loads(f.read(self._metadata_size).decode())
+            else:
+                self._metadata = [None] * len(self)
+        return self._metadata
+
+    def batches(self, batch_size):
+        """ Splits the store into batches of consecutive tracks
+
+        Args:
+            batch_size (int): Number of tracks per batch
+
+        Yields
+            tuple: The index of the first track of the batch, the (P, 2) points and
+                the B+1 offsets of its tracks, as for Decide.decide_many
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size should be at least 1")
+        for first in range(0, len(self), batch_size):
+            offsets = np.array(self.offsets[first : first + batch_size + 1])
+            points = self.points[offsets[0] : offsets[-1]]
+            yield first, points, offsets - offsets[0]
+
+    def decide_many(self, decider, batch_size=1 << 16, writer=None):
+        """ Computes the launch decisions of all the tracks
+
+        The tracks are evaluated batch by batch, see Decide.decide_many, so that only
+        one batch is held in memory at a time.
+
+        Args:
+            decider (Decide): Decide instance with the parameters, LCM and PUV
+            batch_size (int): Number of tracks per batch
+            writer (ResultWriter): Also write the CMV, the FUV and the decision of each
+                track, batch by batch. All the LICs are then evaluated, see
+                ResultWriter.record
+
+        Returns
+            ndarray: The launch decision of each track
+        """
+        decisions = np.zeros(len(self), dtype=bool)
+        for first, points, offsets in self.batches(batch_size):
+            if writer is None:
+                batch = decider.decide_many(points, offsets)
+            else:
+                batch = writer.record(decider, points, offsets)
+            decisions[first : first + len(batch)] = batch
+        return decisions
+
+
+def write_tracks(path, tracks, metadata=None, dtype=np.float64):
+    """ Writes tracks to a new track store
+
+    Args:
+        path (str): Path of the store
+        tracks (iterable): Lists of coordinates of data points, or (N, 2) arrays
+        metadata (iterable): Metadata of each track, or None
+        dtype (dtype): Type of the coordinates, float64 or float32
+    """
+    with TrackStoreWriter(path, dtype) as writer:
+        if metadata is None:
+            for points in tracks:
+                writer.append(points)
+        else:
+            for points, item in zip(tracks, metadata):
+                writer.append(points, item)
+
+
+def convert_json(source, path, dtype=np.float64):
+    """ Converts a JSON file of tracks to a track store
+
+    The JSON file holds a list of tracks. A track is either a list of [x, y]
+    coordinates, or an object with the coordinates under "points", whose other
+    members are kept as the metadata of the track.
+
+    Args:
+        source (str): Path of the JSON file
+        path (str): Path of the store
+        dtype (dtype): Type of the coordinates, float64 or float32
+    """
+    with open(source) as f:
+        tracks = json.load(f)
+    with TrackStoreWriter(path, dtype) as writer:
+        for track in tracks:
+            if isinstance(track, dict):
+                metadata = {
+                    key: value for key, value in track.items() if key != "points"
+                }
+                writer.append(track["points"], metadata)
+            else:
+                writer.append(track)
+
+
+def convert_jsonl(source, path, dtype=np.float64, block_size=1 << 20):
+    """ Converts a JSON Lines file of tracks to a track store
+
+    The file is parsed block by block, see loader.read_jsonl.
+
+    Args:
+        source (str): Path of the JSON Lines file
+        path (str): Path of the store
+        dtype (dtype): Type of the coordinates, float64 or float32
+        block_size (int): Number of characters read at a time
+    """
+    with TrackStoreWriter(path, dtype) as writer:
+        for points, offsets, metadata in loader.read_jsonl(source, block_size):
+            writer.extend(points, offsets, metadata)
+
+
+def convert_csv(source, path, dtype=np.float64, block_size=1 << 20):
+    """ Converts a CSV file of points to a track store
+
+    The CSV file has a header with at least the columns track, x and y, and one row
+    per point. Consecutive rows with the same track identifier form a track, and the
+    identifier is kept as the metadata of the track. The file is parsed block by
+    block, see loader.read_csv; quoted fields are not supported.
+
+    Args:
+        source (str): Path of the CSV file
+        path (str): Path of the store
+        dtype (dtype): Type of the coordinates, float64 or float32
+        block_size (int): Number of characters read at a time
+    """
+    with TrackStoreWriter(path, dtype) as writer:
+        for points, offsets, metadata in loader.read_csv(source, block_size):
+            writer.extend(points, offsets, metadata)
@@ -0,0 +1,232 @@
+import collections
+import itertools
+import math
+
+import numpy as np
+
+from . import kernels
+from .decide import (
+    ALL_LICS_MASK,
+    IMPLEMENTED_LICS,
+    NUMBER_OF_LICS,
+    Decide,
+    LaunchInterceptorConditions,
+    Point,
+    VectorizedLaunchInterceptorConditions,
+    distances_exceed,
+    encode_vector,
+)
+
+
+class StreamingLaunchInterceptorConditions:
+    """Streaming Launch Interceptor Conditions class
+
+    Evaluates the LICs on a track that grows one point at a time. Each new point only
+    completes one new window of consecutive points per LIC, so a LIC is updated by
+    evaluating it on that window alone: LIC 0 and LIC 5 compare the last two points
+    directly and LIC 4 keeps rolling quadrant counts. LIC 6 still examines the N_PTS
+    points of its newest window.
+
+    The LICs are existential: once met on a prefix of the track a LIC stays met, so its
+    value is latched and it is not evaluated any more. A LIC is not met while the track
+    is shorter than its window (where get_conditions_met_vector would raise a
+    ValueError for LIC 4 and LIC 6).
+
+    With a sliding window, the CMV is the one of the most recent points only and older
+    points expire. Nothing is latched then: for each LIC the start of the most recent
+    window of consecutive points that met it is kept as a witness, and the LIC is met
+    as long as its witness lies inside the sliding window.
+
+    Attributes:
+        parameters (dict): Parameters for the LICs
+        lics (tuple): Indices of the LICs that are evaluated
+        window (int): Number of most recent points the CMV is computed on, or None to
+            use the whole track
+        cmv (list): The Conditions Met Vector of the track, or of its sliding window
+        num_points (int): Number of points of the track so far
+    """
+
+    def __init__(self, parameters, lics=None, window=None):
+        if window is not None and window < 1:
+            raise ValueError("window should contain at least one point")
+        self.parameters = parameters
+        self.window = window
+        self.conditions = LaunchInterceptorConditions(parameters)
+        self.vectorized = VectorizedLaunchInterceptorConditions(parameters)
+        if lics is None:
+            lics = IMPLEMENTED_LICS
+        self.lics = tuple(i for i in lics if i in IMPLEMENTED_LICS)
+        for i in self.lics:
+            self.conditions.check_parameters(i, window or math.inf)
+        self.cmv = [False] * NUMBER_OF_LICS
+        self.num_points = 0
+
+        self._pending = list(self.lics)
+        self._witnesses = [None] * NUMBER_OF_LICS
+        history = [self.conditions.window_size(i) for i in self.lics]
+        self._recent = collections.deque(maxlen=max(history + [1]))
+        self._quadrants = collections.deque()
+        self._quadrant_counts = [0] * 5
+
+    def push(self, point):
+        """ Appends a data point to the track
+
+        Args:
+            point (list): [x, y] coordinates of the data point
+
+        Returns
+            list: Indices of the LICs whose value changed
+        """
+        point = (float(point[0]), float(point[1]))
+        self._recent.append(point)
+        self.num_points += 1
+        if 4 in self._pending:
+            self._push_quadrant(point)
+
+        met = [i for i in self._pending if self._newest_window_met(i)]
+        if self.window is None:
+            self._latch(met)
+            return met
+        for i in met:
+            self._witnesses[i] = self.num_points - self.conditions.window_size(i)
+        return self._expire()
+
+    def extend(self, points):
+        """ Appends several data points to the track
+
+        The windows completed by the new points are evaluated at once with the
+        vectorized engine, together with the end of the track they overlap.
+
+        Args:
+            points (array): List of coordinates of data points, or an (N, 2) array
+
+        Returns
+            list: Indices of the LICs whose value changed
+        """
+        points = kernels.as_points_array(points)
+        if len(points) == 0:
+            return []
+        block = np.concatenate([kernels.as_points_array(list(self._recent)), points])
+        first = self.num_points - len(self._recent)
+        self.num_points += len(points)
+        self._recent.extend(map(tuple, points[-self._recent.maxlen :].tolist()))
+        if 4 in self._pending:
+            for point in points[-self.parameters["q_pts"] :].tolist():
+                self._push_quadrant(point)
+
+        if self.window is None:
+            met = [
+                i
+                for i in self._pending
+                if np.any(self.vectorized.window_conditions(i, block))
+            ]
+            self._latch(met)
+            return met
+        for i in self._pending:
+            starts = np.flatnonzero(self.vectorized.window_conditions(i, block))
+            if len(starts):
+                self._witnesses[i] = first + int(starts[-1])
+        return self._expire()
+
+    def _newest_window_met(self, i):
+        if i == 4:
+            distinct = sum(count > 0 for count in self._quadrant_counts)
+            full = len(self._quadrants) == self.parameters["q_pts"]
+            return full and distinct > self.parameters["quads"]
+        size = self.conditions.window_size(i)
+        if size < 1 or size > len(self._recent):
+            return False
+        if i in (0, 5):
+            (x1, y1), (x2, y2) = self._recent[-2], self._recent[-1]
+            if i == 5:
+                return x2 < x1
+            squared = (x2 - x1) * (x2 - x1) + (y2 - y1) * (y2 - y1)
+            return bool(distances_exceed(squared, self.parameters["length1"]))
+        window = list(itertools.islice(self._recent, len(self._recent) - size, None))
+        return self.conditions.evaluate(i, window)
+
+    def _push_quadrant(self, point):
+        quadrant = Point(point).quadrant()
+        self._quadrants.append(quadrant)
+        self._quadrant_counts[quadrant] += 1
+        if len(self._quadrants) > self.parameters["q_pts"]:
+            self._quadrant_counts[self._quadrants.popleft()] -= 1
+
+    def _expire(self):
+        oldest = self.num_points - self.window
+        changed = []
+        for i in self.lics:
+            met = self._witnesses[i] is not None and self._witnesses[i] >= oldest
+            if met != self.cmv[i]:
+                self.cmv[i] = met
+                changed.append(i)
+        return changed
+
+    def _latch(self, lics):
+        for i in lics:
+            self.cmv[i] = True
+            self._pending.remove(i)
+
+
+class StreamingDecide:
+    """Streaming Decide class
+
+    Maintains the launch decision of a track that grows one point at a time, without
+    evaluating the whole track again. Only the relevant LICs of the configuration are
+    evaluated, see StreamingLaunchInterceptorConditions.
+
+    The PUM and the FUV only combine the CMV with AND and OR, so on a whole track the
+    decision can only change from no launch to launch as LICs become met. Once the
+    decision is launch it is latched and the LICs are not evaluated any more. With a
+    sliding window the decision is the one for the most recent points, and it is
+    updated whenever a LIC becomes met or expires.
+
+    Attributes:
+        decider (Decide): Decide instance with the compiled LCM and PUV
+        conditions (StreamingLaunchInterceptorConditions): State of the LICs
+        launch (bool): The launch decision for the track so far
+    """
+
+    def __init__(self, parameters, lcm, puv, window=None):
+        self.decider = Decide(parameters, lcm, puv)
+        self.conditions = StreamingLaunchInterceptorConditions(
+            parameters, self.decider.relevant_lics, window
+        )
+        self.launch = self._decide()
+
+    def push(self, point):
+        """ Appends a data point to the track
+
+        Args:
+            point (list): [x, y] coordinates of the data point
+
+        Returns
+            bool: The launch decision for the track so far
+        """
+        if self._latched():
+            return self.launch
+        if self.conditions.push(point):
+            self.launch = self._decide()
+        return self.launch
+
+    def extend(self, points):
+        """ Appends several data points to the track
+
+        Args:
+            points (array): List of coordinates of data points, or an (N, 2) array
+
+        Returns
+            bool: The launch decision for the track so far
+        """
+        if self._latched():
+            return self.launch
+        if self.conditions.extend(points):
+            self.launch = self._decide()
+        return self.launch
+
+    def _latched(self):
+        return self.launch and self.conditions.window is None
+
+    def _decide(self):
+        cmv_code = encode_vector(self.conditions.cmv)
+        return self.decider.compute_final_unlocking_code(cmv_code) == ALL_LICS_MASK
@@ -0,0 +1,300 @@
+import itertools
+
+import numpy as np
+
+from . import kernels
+from .decide import (
+    ALL_LICS_MASK,
+    IMPLEMENTED_LICS,
+    NUMBER_OF_LICS,
+    Decide,
+    LaunchInterceptorConditions,
+    Point,
+    angle_deviates_from_pi,
+    distances_exceed,
+    encode_vector,
+    encode_vectors,
+    radii_exceed,
+)
+
+
+class TrackSummary:
+    """Track Summary class
+
+    Most LICs hold exactly when a statistic of the windows of consecutive points
+    exceeds the parameter of the LIC, so these critical values are computed once per
+    track and any set of parameters is then evaluated in O(1):
+
+    - LIC 0: the largest squared distance between consecutive points
+    - LIC 1: the largest squared radius of the circle enclosing three consecutive points
+    - LIC 2: the three consecutive points whose angle deviates the most from PI
+    - LIC 3: the largest area of three consecutive points
+    - LIC 4: for k = 1 to 4, the length of the shortest window of consecutive points
+      lying in k distinct quadrants. A window of Q_PTS points lies in more than QUADS
+      quadrants exactly when Q_PTS is at least the length for QUADS + 1
+    - LIC 5: whether the x coordinate ever decreases
+
+    LIC 6 depends on N_PTS, so its largest chord distance is computed for each N_PTS
+    the first time it is needed, and cached.
+
+    Attributes:
+        points (ndarray): (N, 2) array of the points of the track
+        num_points (int): Number of points of the track
+        max_squared_distance (float): Critical value of LIC 0, None for a single point
+        max_squared_radius (float): Critical value of LIC 1, None for less than three
+            points
+        widest_angle (tuple): The three Points of the critical angle of LIC 2, None when
+            all the angles are undefined
+        max_area (float): Critical value of LIC 3, None for less than three points
+        quadrant_window_lengths (list): Critical values of LIC 4, indexed by the number
+            of distinct quadrants (0 to 4), None when no window has that many
+        x_decreases (bool): Value of LIC 5
+        hull_n_pts (int): N_PTS from which the chord distances are computed with convex
+            hulls, see LaunchInterceptorConditions
+    """
+
+    def __init__(self, points, hull_n_pts=None):
+        self.points = kernels.as_points_array(points)
+        self.num_points = len(self.points)
+        self.hull_n_pts = hull_n_pts
+        self._chord_distances = {}
+
+        squared_distances = kernels.consecutive_squared_distances(self.points)
+        self.max_squared_distance = _max_or_none(squared_distances)
+        squared_radii = kernels.triangle_enclosing_radii_squared(self.points)
+        self.max_squared_radius = _max_or_none(squared_radii)
+        self.max_area = _max_or_none(kernels.triangle_areas(self.points))
+        self.widest_angle = self._widest_angle()
+        self.quadrant_window_lengths = self._quadrant_window_lengths()
+        self.x_decreases = bool(np.any(kernels.x_decreases(self.points)))
+
+    def _widest_angle(self):
+        a, b, c = self.points[:-2], self.points[1:-1], self.points[2:]
+        u, v = a - b, c - b
+        norms = np.sqrt((u * u).sum(axis=1) * (v * v).sum(axis=1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cosines = (u * v).sum(axis=1) / norms
+        cosines[kernels.coincident_vertices(self.points)] = np.nan
+        if np.all(np.isnan(cosines)):
+            return None
+        # The angle at the vertex deviates the most from PI when it is the sharpest
+        i = int(np.nanargmax(cosines))
+        return tuple(Point(point) for point in self.points[i : i + 3])
+
+    def _quadrant_window_lengths(self):
+        lengths = [0] + [None] * 4
+        if self.num_points == 0:
+            return lengths
+        quadrants = kernels.quadrants(self.points)
+        indices = np.arange(self.num_points)
+        # Index of the last point in each quadrant, up to each point (-1 for none)
+        last = np.stack(
+            [
+                np.maximum.accumulate(np.where(quadrants == quadrant, indices, -1))
+                for quadrant in range(1, 5)
+            ],
+            axis=1,
+        )
+        last = -np.sort(-last, axis=1)
+        for k in range(1, 5):
+            found = last[:, k - 1] >= 0
+            if np.any(found):
+                lengths[k] = int((indices - last[:, k - 1])[found].min()) + 1
+        return lengths
+
+    def chord_distance(self, n_pts):
+        """ Gets the largest distance to the chord of a window of N_PTS points
+
+        Args:
+            n_pts (int): Number of consecutive points in a window
+
+        Returns
+            float: The largest distance, -inf when the track has no such window
+        """
+        if n_pts not in self._chord_distances:
+            conditions = LaunchInterceptorConditions(
+                {"n_pts": n_pts}, hull_n_pts=self.hull_n_pts
+            )
+            distances = conditions.chord_distances(self.points)
+            self._chord_distances[n_pts] = float(distances.max(initial=-np.inf))
+        return self._chord_distances[n_pts]
+
+    def condition_met(self, i, parameters):
+        """ Checks whether a Launch Interceptor Condition is met by the track
+
+        The parameters are checked as by LaunchInterceptorConditions.
+
+        Args:
+            i (int): Index of the LIC
+            parameters (dict): Parameters for the LICs
+
+        Returns
+            bool: True if the condition is met, False if the LIC is not implemented
+        """
+        if i not in IMPLEMENTED_LICS:
+            return False
+        LaunchInterceptorConditions(parameters).check_parameters(i, self.num_points)
+        if i == 0:
+            if self.max_squared_distance is None:
+                return False
+            return bool(
+                distances_exceed(self.max_squared_distance, parameters["length1"])
+            )
+        if i == 1:
+            if self.max_squared_radius is None:
+                return False
+            return bool(radii_exceed(self.max_squared_radius, parameters["radius1"]))
+        if i == 2:
+            if self.widest_angle is None:
+                return False
+            cos_epsilon = np.cos(parameters["epsilon"])
+            return angle_deviates_from_pi(*self.widest_angle, cos_epsilon)
+        if i == 3:
+            return self.max_area is not None and self.max_area > parameters["area1"]
+        if i == 4:
+            length = self.quadrant_window_lengths[parameters["quads"] + 1]
+            return length is not None and parameters["q_pts"] >= length
+        if i == 5:
+            return self.x_decreases
+        return self.chord_distance(parameters["n_pts"]) > parameters["dist"]
+
+    def get_conditions_met_vector(self, parameters, lics=None):
+        """ Gets the Conditions Met Vector of the track for a set of parameters
+
+        Args:
+            parameters (dict): Parameters for the LICs
+            lics (iterable): Indices of the LICs to evaluate, the other elements of the
+                CMV are left False. All the LICs are evaluated by default
+
+        Returns
+            list: The Conditions Met Vector
+        """
+        if lics is None:
+            lics = range(NUMBER_OF_LICS)
+        cmv = [False] * NUMBER_OF_LICS
+        for i in lics:
+            cmv[i] = self.condition_met(i, parameters)
+        return cmv
+
+    def get_conditions_met_matrix(self, parameter_sets, lics=None):
+        """ Gets the Conditions Met Vectors of the track for many sets of parameters
+
+        Each LIC is evaluated for all the sets of parameters at once, by comparing its
+        critical value with the array of its parameter. The chord distances of LIC 6
+        are computed once for each distinct N_PTS, and the windows of LIC 4 are not
+        examined again whatever Q_PTS is.
+
+        Args:
+            parameter_sets (list): List of parameter dicts for the LICs
+            lics (iterable): Indices of the LICs to evaluate, the other elements of the
+                CMVs are left False. All the LICs are evaluated by default
+
+        Returns
+            ndarray: (K, NUMBER_OF_LICS) boolean array, the CMV of each set
+        """
+        if lics is None:
+            lics = range(NUMBER_OF_LICS)
+        lics = [i for i in lics if i in IMPLEMENTED_LICS]
+        for parameters in parameter_sets:
+            conditions = LaunchInterceptorConditions(parameters)
+            for i in lics:
+                conditions.check_parameters(i, self.num_points)
+
+        def values(name):
+            return np.array([parameters[name] for parameters in parameter_sets])
+
+        cmvs = np.zeros((len(parameter_sets), NUMBER_OF_LICS), dtype=bool)
+        for i in lics:
+            if i == 0 and self.max_squared_distance is not None:
+                lengths = values("length1")
+                cmvs[:, 0] = distances_exceed(self.max_squared_distance, lengths)
+            elif i == 1 and self.max_squared_radius is not None:
+                radii = values("radius1")
+                cmvs[:, 1] = radii_exceed(self.max_squared_radius, radii)
+            elif i == 2 and self.widest_angle is not None:
+                cos_epsilons = np.cos(values("epsilon"))
+                cmvs[:, 2] = [
+                    angle_deviates_from_pi(*self.widest_angle, cos_epsilon)
+                    for cos_epsilon in cos_epsilons.tolist()
+                ]
+            elif i == 3 and self.max_area is not None:
+                cmvs[:, 3] = self.max_area > values("area1")
+            elif i == 4:
+                lengths = np.array(
+                    [np.inf if n is None else n for n in self.quadrant_window_lengths]
+                )
+                cmvs[:, 4] = values("q_pts") >= lengths[values("quads") + 1]
+            elif i == 5:
+                cmvs[:, 5] = self.x_decreases
+            elif i == 6:
+                n_pts = values("n_pts")
+                distances = np.array([self.chord_distance(n) for n in n_pts.tolist()])
+                cmvs[:, 6] = distances > values("dist")
+        return cmvs
+
+    def decide(self, decider):
+        """ Computes the launch decision of the track
+
+        Only the relevant LICs of the configuration are evaluated.
+
+        Args:
+            decider (Decide): Decide instance with the parameters, LCM and PUV
+
+        Returns
+            bool: The launch decision
+        """
+        cmv = self.get_conditions_met_vector(decider.parameters, decider.relevant_lics)
+        return decider.compute_final_unlocking_code(encode_vector(cmv)) == ALL_LICS_MASK
+
+
+def parameter_grid(grid):
+    """ Builds the sets of parameters of a grid
+
+    Args:
+        grid (dict): Values of each parameter, either a single value or a list of
+            values to try
+
+    Returns
+        list: One parameter dict for each combination of the values
+    """
+    names = list(grid)
+    choices = []
+    for name in names:
+        values = grid[name]
+        if not isinstance(values, (list, tuple, np.ndarray)):
+            values = [values]
+        choices.append(values)
+    return [dict(zip(names, values)) for values in itertools.product(*choices)]
+
+
+def sweep(points, parameter_sets, lcm, puv, hull_n_pts=None):
+    """ Evaluates a track for many sets of parameters
+
+    The geometry of the track is computed once (see TrackSummary), and each LIC is
+    evaluated for all the sets of parameters at once. The relevance of the LICs does
+    not depend on the parameters, so the combinational stage is compiled once too.
+
+    Args:
+        points (array): List of coordinates of data points, or a TrackSummary
+        parameter_sets (list): List of parameter dicts for the LICs, see
+            parameter_grid
+        lcm (array): Logical Connector Matrix
+        puv (array): Preliminary Unlocking Vector
+        hull_n_pts (int): N_PTS from which the chord distances are computed with
+            convex hulls, see LaunchInterceptorConditions
+
+    Returns
+        tuple: The (K, NUMBER_OF_LICS) CMVs and the K launch decisions
+    """
+    if not isinstance(points, TrackSummary):
+        points = TrackSummary(points, hull_n_pts)
+    decider = Decide({}, lcm, puv)
+    cmvs = points.get_conditions_met_matrix(parameter_sets)
+    decisions = decider.decide_cmv_codes(encode_vectors(cmvs))
+    return cmvs, decisions
+
+
+def _max_or_none(values):
+    if len(values) == 0:
+        return None
+    return float(values.max())
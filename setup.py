@@ -6,7 +6,7 @@ here = os.path.abspath(os.path.dirname(__file__))
 with open(os.path.join(here, "README.md")) as f:
     README = f.read()
 
-INSTALL_REQUIRES = ["numpy"]
+INSTALL_REQUIRES = ["numpy>=1.17"]
 
 EXTRAS_REQUIRE = {
     "testing": ["pytest"],
@@ -26,6 +26,7 @@ setup(
     url="",
     keywords="homework",
     packages=find_packages(),
+    python_requires=">=3.6",
     include_package_data=True,
     zip_safe=False,
     extras_require=EXTRAS_REQUIRE,
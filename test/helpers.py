@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+
+from decide import decide
+
+PARAMETERS = {
+    "length1": 2,
+    "epsilon": 1,
+    "area1": 2,
+    "radius1": 1,
+    "q_pts": 3,
+    "quads": 1,
+    "n_pts": 3,
+    "dist": 1.5,
+}
+# Launches exactly when LIC 1 and LIC 3 are met, which random tracks may or may not do
+LCM = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+PUV = [i in (1, 3) for i in range(decide.NUMBER_OF_LICS)]
+
+
+def random_parameters(rng):
+    # rng is a np.random.RandomState, whose randint excludes the upper bound
+    return {
+        "length1": rng.uniform(1, 5),
+        "epsilon": rng.uniform(0, math.pi),
+        "area1": rng.uniform(0, 6),
+        "radius1": rng.uniform(1, 5),
+        "q_pts": rng.randint(2, 6),
+        "quads": rng.randint(1, 4),
+        "n_pts": rng.randint(3, 6),
+        "dist": rng.uniform(0, 4),
+    }
+
+
+def random_tracks(seed, num_tracks=30):
+    rng = np.random.RandomState(seed)
+    return [
+        rng.normal(scale=2, size=(rng.randint(3, 12), 2)) for i in range(num_tracks)
+    ]
+
+
+def random_batch(seed, num_tracks=30):
+    tracks = random_tracks(seed, num_tracks)
+    offsets = np.cumsum([0] + [len(track) for track in tracks])
+    return np.concatenate(tracks), offsets
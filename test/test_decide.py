@@ -1,7 +1,13 @@
 import pytest
 import math
+import random
+
+import numpy as np
 
 from decide import decide
+from decide import kernels
+
+from .helpers import random_parameters
 
 
 @pytest.mark.parametrize(
@@ -81,6 +87,8 @@ def test_decide(parameters, lcm, puv, points, expected_decision):
     """
     decider = decide.Decide(parameters, lcm, puv)
     assert decider.decide(points) == expected_decision
+    decider = decide.Decide(parameters, lcm, puv, truth_table=True)
+    assert decider.decide(points) == expected_decision
 
 
 @pytest.mark.parametrize(
@@ -655,7 +663,7 @@ def test_pum(cmv, lcm, expected_pum):
     Verify that the compute_preliminary_unlocking_matrix function returns
     expected values
     """
-    decider = decide.Decide({}, lcm, [])
+    decider = decide.Decide({}, lcm, [False] * decide.NUMBER_OF_LICS)
     assert decider.compute_preliminary_unlocking_matrix(cmv) == expected_pum
 
 
@@ -1245,10 +1253,388 @@ def test_fuv(puv, pum, expected_fuv):
     Verify that the compute_final_unlocking_vector function returns
     expected values
     """
-    decider = decide.Decide({}, [], puv)
+    lcm = [["NOT_USED"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    decider = decide.Decide({}, lcm, puv)
     assert decider.compute_final_unlocking_vector(pum) == expected_fuv
 
 
+@pytest.mark.parametrize(
+    "lcm",
+    [
+        [],
+        [["ORR"] * decide.NUMBER_OF_LICS] * (decide.NUMBER_OF_LICS - 1),
+        [["ORR"] * (decide.NUMBER_OF_LICS - 1)] * decide.NUMBER_OF_LICS,
+        [["ORR"] * (decide.NUMBER_OF_LICS - 1) + ["XOR"]] * decide.NUMBER_OF_LICS,
+    ],
+)
+def test_lcm_value_error(lcm):
+    """
+    The LCM should be validated when the Decide instance is created
+    """
+    with pytest.raises(ValueError):
+        decide.Decide({}, lcm, [True] * decide.NUMBER_OF_LICS)
+
+
+@pytest.mark.parametrize(
+    "puv",
+    [[], [True] * (decide.NUMBER_OF_LICS - 1), [True] * (decide.NUMBER_OF_LICS + 1)],
+)
+def test_puv_value_error(puv):
+    """
+    The PUV should be validated when the Decide instance is created
+    """
+    with pytest.raises(ValueError):
+        decide.Decide(
+            {}, [["ANDD"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS, puv
+        )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_final_unlocking_code(seed):
+    """
+    The FUV computed from the compiled LCM should match the FUV computed from the PUM
+    """
+    rng = random.Random(seed)
+    connectors = ["ANDD", "ORR", "NOT_USED"]
+    lcm = [
+        [rng.choice(connectors) for column in range(decide.NUMBER_OF_LICS)]
+        for row in range(decide.NUMBER_OF_LICS)
+    ]
+    puv = [rng.random() < 0.5 for i in range(decide.NUMBER_OF_LICS)]
+    decider = decide.Decide({}, lcm, puv)
+    for i in range(100):
+        cmv = [rng.random() < 0.8 for i in range(decide.NUMBER_OF_LICS)]
+        pum = decider.compute_preliminary_unlocking_matrix(cmv)
+        for row in range(decide.NUMBER_OF_LICS):
+            for column in range(decide.NUMBER_OF_LICS):
+                assert pum[row][column] == decide.LogicalConnector.create_from_string(
+                    lcm[row][column]
+                ).apply(cmv[row], cmv[column])
+        fuv = decider.compute_final_unlocking_vector(pum)
+        fuv_code = decider.compute_final_unlocking_code(decide.encode_vector(cmv))
+        assert decide.decode_vector(fuv_code) == fuv
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_truth_table(seed):
+    """
+    The launch decisions from the truth table should match the compiled LCM and PUV
+    """
+    rng = random.Random(seed)
+    connectors = ["ANDD", "ORR", "NOT_USED"]
+    lcm = [
+        [rng.choice(connectors) for column in range(decide.NUMBER_OF_LICS)]
+        for row in range(decide.NUMBER_OF_LICS)
+    ]
+    puv = [rng.random() < 0.3 for i in range(decide.NUMBER_OF_LICS)]
+    decider = decide.Decide({}, lcm, puv)
+    codes = np.arange(1 << decide.NUMBER_OF_LICS)
+    expected = [
+        decider.compute_final_unlocking_code(code) == decide.ALL_LICS_MASK
+        for code in codes.tolist()
+    ]
+    assert decider.decide_cmv_codes(codes).tolist() == expected
+    decider.build_truth_table()
+    assert decider.truth_table.nbytes == (1 << decide.NUMBER_OF_LICS) // 8
+    assert decider.decide_cmv_codes(codes).tolist() == expected
+
+
+def test_decide_truth_table_lookup():
+    """
+    Once all the relevant LICs are evaluated, decide should look up the truth table
+    """
+    lcm = [["NOT_USED"] * decide.NUMBER_OF_LICS for i in range(decide.NUMBER_OF_LICS)]
+    lcm[0][5] = lcm[5][0] = "ANDD"
+    puv = [i == 0 for i in range(decide.NUMBER_OF_LICS)]
+    points = [[0, 0], [5, 0], [1, 0]]
+    decider = decide.Decide({"length1": 2}, lcm, puv, truth_table=True)
+    assert decider.relevant_lics == (0, 5)
+    assert decider.decide(points) is True
+    decider.truth_table = ~decider.truth_table
+    assert decider.decide(points) is False
+
+
+def _lcm_with(connectors):
+    """Build a NOT_USED LCM with the given symmetric (row, column): connector entries"""
+    lcm = [["NOT_USED"] * decide.NUMBER_OF_LICS for i in range(decide.NUMBER_OF_LICS)]
+    for (row, column), connector in connectors.items():
+        lcm[row][column] = lcm[column][row] = connector
+    return lcm
+
+
+@pytest.mark.parametrize(
+    "lcm, puv_rows, expected_relevant",
+    [
+        # Nothing is relevant when the PUV is all False
+        ([["ANDD"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS, [], ()),
+        # The diagonal ORR of an enabled row requires its own LIC to be met, which
+        # then satisfies every other ORR of the row
+        ([["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS, [0], (0,)),
+        (_lcm_with({(0, 1): "ANDD"}), [0], (0, 1)),
+        (_lcm_with({(0, 1): "ANDD", (5, 6): "ORR"}), [0], (0, 1)),
+        # Row 1 forces LIC 0 and LIC 1, so the ORR with LIC 6 cannot matter
+        (_lcm_with({(0, 1): "ANDD", (0, 6): "ORR"}), [0, 1], (0, 1)),
+        # An enabled row with only NOT_USED connectors is always unlocked
+        (_lcm_with({(3, 4): "ANDD"}), [2], ()),
+    ],
+)
+def test_relevant_lics(lcm, puv_rows, expected_relevant):
+    """
+    Only the LICs that can change the launch decision should be relevant
+    """
+    puv = [i in puv_rows for i in range(decide.NUMBER_OF_LICS)]
+    decider = decide.Decide({}, lcm, puv)
+    assert decider.relevant_lics == expected_relevant
+    assert set(decider.skipped_lics) == set(range(decide.NUMBER_OF_LICS)) - set(
+        expected_relevant
+    )
+
+
+def test_decide_skips_irrelevant_lics():
+    """
+    decide() should not evaluate the LICs that cannot change the decision
+    """
+    parameters = {"length1": 1, "n_pts": 10, "dist": -1}
+    puv = [True] + [False] * (decide.NUMBER_OF_LICS - 1)
+    decider = decide.Decide(parameters, _lcm_with({(0, 0): "ANDD"}), puv)
+    # LIC 6 would raise a ValueError for these points and parameters
+    assert decider.decide([[0, 0], [2, 0]]) is True
+    assert decider.decide([[0, 0], [1, 0]]) is False
+
+
+def test_decide_early_termination():
+    """
+    decide() should stop evaluating LICs once the decision cannot change
+    """
+    parameters = {"length1": 1, "n_pts": 10, "dist": -1}
+    puv = [True] + [False] * (decide.NUMBER_OF_LICS - 1)
+    decider = decide.Decide(parameters, _lcm_with({(0, 6): "ANDD"}), puv)
+    assert decider.evaluation_order == (0, 6)
+    # LIC 0 is not met, so LIC 6 (which would raise a ValueError) is not evaluated
+    assert decider.decide([[0, 0], [1, 0]]) is False
+    with pytest.raises(ValueError):
+        decider.decide([[0, 0], [2, 0]])
+
+
+def test_decide_evaluation_order_costs():
+    """
+    The LICs should be evaluated in order of increasing cost
+    """
+    lcm = _lcm_with({(0, 1): "ANDD", (0, 2): "ANDD", (0, 5): "ANDD", (0, 6): "ANDD"})
+    puv = [True] + [False] * (decide.NUMBER_OF_LICS - 1)
+    decider = decide.Decide({"n_pts": 50}, lcm, puv)
+    assert decider.evaluation_order == (5, 0, 2, 1, 6)
+    costs = list(range(decide.NUMBER_OF_LICS, 0, -1))
+    decider = decide.Decide({"n_pts": 50}, lcm, puv, costs=costs)
+    assert decider.evaluation_order == (6, 5, 2, 1, 0)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_decide_scheduled_matches_full_evaluation(seed):
+    """
+    The scheduled evaluation should give the same decision as evaluating every LIC
+    """
+    rng = random.Random(seed)
+    connectors = ["ANDD", "ORR", "NOT_USED", "NOT_USED"]
+    lcm = [[None] * decide.NUMBER_OF_LICS for i in range(decide.NUMBER_OF_LICS)]
+    for row in range(decide.NUMBER_OF_LICS):
+        for column in range(row + 1):
+            lcm[row][column] = lcm[column][row] = rng.choice(connectors)
+    puv = [rng.random() < 0.3 for i in range(decide.NUMBER_OF_LICS)]
+    parameters = random_parameters(np.random.RandomState(seed))
+    decider = decide.Decide(parameters, lcm, puv)
+    for i in range(20):
+        points = [[rng.gauss(0, 2), rng.gauss(0, 2)] for i in range(8)]
+        cmv = decider.lic.get_conditions_met_vector(points)
+        expected = decider.compute_final_unlocking_code(decide.encode_vector(cmv))
+        assert decider.decide(points) is (expected == decide.ALL_LICS_MASK)
+
+
+def _random_lcm(rng):
+    connectors = ["ANDD", "ORR", "NOT_USED"]
+    lcm = [[None] * decide.NUMBER_OF_LICS for i in range(decide.NUMBER_OF_LICS)]
+    for row in range(decide.NUMBER_OF_LICS):
+        for column in range(row + 1):
+            lcm[row][column] = lcm[column][row] = rng.choice(connectors)
+    return lcm
+
+
+@pytest.mark.parametrize("block_size", [1, 100, 1 << 22])
+def test_decide_configurations(block_size):
+    """
+    The decisions and FUVs of many configurations should match Decide for each one
+    """
+    rng = random.Random(block_size)
+    lcms = [_random_lcm(rng) for i in range(12)]
+    puvs = [[rng.random() < 0.3 for j in range(decide.NUMBER_OF_LICS)] for i in lcms]
+    cmvs = np.array([[rng.random() < 0.7 for j in range(decide.NUMBER_OF_LICS)]] * 3)
+    cmvs = np.concatenate([cmvs, np.random.RandomState(0).rand(40, 15) < 0.8])
+    decisions, fuv_codes = decide.decide_configurations(
+        lcms, puvs, cmvs, return_fuv=True, block_size=block_size
+    )
+    assert decisions.shape == fuv_codes.shape == (len(lcms), len(cmvs))
+    for lcm, puv, row, fuv_row in zip(lcms, puvs, decisions, fuv_codes):
+        decider = decide.Decide({}, lcm, puv)
+        for cmv, decision, fuv_code in zip(cmvs, row, fuv_row):
+            expected = decider.compute_final_unlocking_code(decide.encode_vector(cmv))
+            assert fuv_code == expected
+            assert decision == (expected == decide.ALL_LICS_MASK)
+    packed = decide.decide_configurations(
+        lcms, puvs, decide.encode_vectors(cmvs), packed=True
+    )
+    unpacked = np.unpackbits(packed, axis=1, count=len(cmvs), bitorder="little")
+    assert unpacked.astype(bool).tolist() == decisions.tolist()
+
+
+@pytest.mark.parametrize(
+    "lcms, puvs",
+    [
+        ([[["ANDD"] * 15] * 15], [[True] * 14]),
+        ([[["ANDD"] * 15] * 14], [[True] * 15]),
+        ([[["ANDD"] * 15] * 14 + [["ANDD"] * 14 + ["AND"]]], [[True] * 15]),
+    ],
+)
+def test_decide_configurations_value_error(lcms, puvs):
+    """The LCMs and PUVs should have the right shape and connectors"""
+    with pytest.raises(ValueError):
+        decide.decide_configurations(lcms, puvs, [0, 1])
+
+
+@pytest.mark.parametrize(
+    "seed, chunk_size, vectorized",
+    [(0, 1, False), (1, 4, True), (2, 13, False), (3, 13, True), (4, 1000, False)],
+)
+def test_decide_memmap(tmp_path, seed, chunk_size, vectorized):
+    """
+    A memory-mapped track should be evaluated chunk by chunk with the same result as
+    in memory
+    """
+    rng = random.Random(seed)
+    parameters = random_parameters(np.random.RandomState(seed))
+    points = np.random.RandomState(seed).normal(scale=1.5, size=(200, 2))
+    track = np.memmap(tmp_path / "track", dtype=float, mode="w+", shape=points.shape)
+    track[:] = points
+    track.flush()
+    track = np.memmap(tmp_path / "track", dtype=float, mode="r", shape=points.shape)
+    lcm = _random_lcm(rng)
+    puv = [rng.random() < 0.3 for i in range(decide.NUMBER_OF_LICS)]
+    decider = decide.Decide(
+        parameters, lcm, puv, vectorized=vectorized, chunk_size=chunk_size
+    )
+    expected = decider.lic.get_conditions_met_vector(points)
+    assert decider.lic.get_conditions_met_vector(track) == expected
+    for i in decide.IMPLEMENTED_LICS:
+        assert decider.lic.evaluate(i, track) == expected[i]
+    chunked = decide.ChunkedTrack(track.astype(np.float32), chunk_size)
+    expected = decider.lic.get_conditions_met_vector(points.astype(np.float32))
+    assert decider.lic.get_conditions_met_vector(chunked) == expected
+    assert decider.decide(track) is decider.decide(points)
+
+
+def test_chunked_track_value_error():
+    """The chunks should not be empty, and the track should be an (N, 2) array"""
+    with pytest.raises(ValueError):
+        decide.ChunkedTrack(np.zeros((10, 2)), 0)
+    with pytest.raises(ValueError):
+        decide.ChunkedTrack(np.zeros((10, 3)))
+
+
+def test_encode_decode_vector():
+    """Decoding an encoded vector should give back the vector"""
+    vector = [True, False, False, True] + [False] * (decide.NUMBER_OF_LICS - 5) + [True]
+    assert decide.encode_vector(vector) == 0b100000000001001
+    assert decide.decode_vector(decide.encode_vector(vector)) == vector
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_angle_deviates_from_pi(seed):
+    """
+    The trig-free angle test should agree with the angle computed by Triangle
+    """
+    rng = random.Random(seed)
+    epsilon = rng.uniform(0, math.pi)
+    for i in range(100):
+        a, b, c = [decide.Point([rng.gauss(0, 2), rng.gauss(0, 2)]) for j in range(3)]
+        angle = decide.Triangle(a, b, c).angle_abc()
+        expected = not decide.float_almost_equal(math.pi, angle, epsilon)
+        assert decide.angle_deviates_from_pi(a, b, c, math.cos(epsilon)) is expected
+        points = np.array([[a.x, a.y], [b.x, b.y], [c.x, c.y]])
+        deviates = kernels.angles_deviate_from_pi(points, math.cos(epsilon))
+        assert deviates.tolist() == [expected]
+
+
+@pytest.mark.parametrize(
+    "points, epsilon, expected",
+    [
+        ([[0, 1], [0, 0], [1, 0]], math.pi / 2, True),
+        ([[0, 1], [0, 0], [1, -0.01]], math.pi / 2, False),
+        ([[-1, 0], [0, 0], [1, 0]], 0, True),
+        ([[-1, 0], [0, 0], [1, 0.01]], 0, True),
+        ([[1, 0], [0, 0], [1, 0.01]], 3, True),
+        ([[-1, 0], [0, 0], [1, 1]], 3, False),
+    ],
+)
+def test_angle_deviates_from_pi_boundaries(points, epsilon, expected):
+    """Angles of exactly PI - EPSILON should meet the condition"""
+    a, b, c = [decide.Point(point) for point in points]
+    assert decide.angle_deviates_from_pi(a, b, c, math.cos(epsilon)) is expected
+
+
+def test_geometry_shared_across_lics(monkeypatch):
+    """
+    The points should be converted to an array once per evaluation
+    """
+    calls = []
+    as_points_array = kernels.as_points_array
+
+    def counting_as_points_array(points):
+        calls.append(1)
+        return as_points_array(points)
+
+    monkeypatch.setattr(kernels, "as_points_array", counting_as_points_array)
+    parameters = {"length1": 100, "radius1": 100, "area1": 100}
+    conditions = decide.LaunchInterceptorConditions(parameters)
+    points = [[i, i * i] for i in range(10)]
+    cmv = conditions.get_conditions_met_vector(points, lics=[0, 1, 3, 5])
+    assert cmv == [False] * decide.NUMBER_OF_LICS
+    assert len(calls) == 1
+
+
+def test_geometry_cache():
+    """The geometry of a track should be computed lazily and at most once"""
+    geometry = decide.TrackGeometry.of([[0, 0], [3, 0], [3, 4]])
+    assert decide.TrackGeometry.of(geometry) is geometry
+    assert len(geometry) == 3 and geometry[2] == [3, 4]
+    assert geometry.point(2) is geometry.point(2)
+    assert geometry.point(2) == decide.Point([3, 4])
+    assert geometry.array() is geometry.array()
+    assert geometry.squared_distances() is geometry.squared_distances()
+    assert geometry.squared_distances().tolist() == [9, 16]
+    assert geometry.cross_products() is geometry.cross_products()
+    assert geometry.cross_products().tolist() == [12]
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_geometry_shared_between_lics(vectorized):
+    """
+    LIC 0, LIC 1 and LIC 3 should compute the squared distances and the cross
+    products once per evaluation
+    """
+    parameters = {"length1": 4, "radius1": 2, "area1": 5}
+    if vectorized:
+        conditions = decide.VectorizedLaunchInterceptorConditions(parameters)
+    else:
+        conditions = decide.LaunchInterceptorConditions(parameters)
+    geometry = conditions.prepare_points([[0, 0], [3, 0], [3, 4], [0, 4]])
+    assert conditions.evaluate(0, geometry) is False
+    squared_distances = geometry.squared_distances()
+    cross_products = geometry.cross_products()
+    assert conditions.evaluate(1, geometry) is True
+    assert conditions.evaluate(3, geometry) is True
+    assert geometry.squared_distances() is squared_distances
+    assert geometry.cross_products() is cross_products
+
+
 @pytest.mark.parametrize(
     "float1, float2, epsilon, expected",
     [
@@ -16,6 +16,21 @@ def test_lic0_not_met():
     assert lauch_conditions.lic_0([[0, 0], [1, 1], [2, 2]]) is False
 
 
+@pytest.mark.parametrize(
+    "points,length1,expected",
+    [
+        ([[0, 0], [2, 0], [2, 2]], 2, False),
+        ([[0, 0], [3, 4]], 4.999, True),
+        ([[1, 1], [1, 1]], -1, True),
+        ([[1, 1]], -1, False),
+    ],
+)
+def test_lic0_boundaries(points, length1, expected):
+    """LIC 0 should compare the distances with LENGTH1 strictly"""
+    lauch_conditions = decide.LaunchInterceptorConditions({"length1": length1})
+    assert lauch_conditions.lic_0(points) is expected
+
+
 @pytest.mark.parametrize(
     "points,parameters",
     [
@@ -37,6 +52,8 @@ def test_lic1_met(points, parameters):
     [
         ([[0, 0], [0, 4], [2, 2]], {"radius1": 2}),
         ([[0, 0], [1, 0], [10, 2]], {"radius1": 24}),
+        ([[0, 0], [1, 0], [10, 2]], {"radius1": 5.1}),
+        ([[0, 0], [2, 0], [1, 1]], {"radius1": 1 - 1e-9}),
     ],
 )
 def test_lic1_not_met(points, parameters):
@@ -51,8 +68,11 @@ def test_lic1_not_met(points, parameters):
 @pytest.mark.parametrize(
     "points,parameters, expected",
     [
-        ([[0, 0], [2, 2], [4, 4]], {"radius1": 3}, True),
+        ([[0, 0], [2, 2], [4, 4]], {"radius1": 3}, False),
+        ([[0, 0], [4, 4], [8, 8]], {"radius1": 3}, True),
         ([[0, 0], [0, 1], [0, 2]], {"radius1": 3}, False),
+        ([[0, 0], [0, 2], [0, 1]], {"radius1": 0.9}, True),
+        ([[0, 0], [0, 0], [0, 2]], {"radius1": 1}, False),
     ],
 )
 def test_lic1_collinear_case(points, parameters, expected):
@@ -0,0 +1,117 @@
+import pytest
+import json
+
+import numpy as np
+
+from decide import decide
+from decide import loader
+
+from .helpers import LCM, PARAMETERS, PUV, random_tracks
+
+
+def _random_tracks(seed):
+    return [track.tolist() for track in random_tracks(seed)]
+
+
+def _write_jsonl(path, tracks):
+    lines = []
+    for k, points in enumerate(tracks):
+        track = {"points": points, "id": k} if k % 4 == 0 else points
+        lines.append(json.dumps(track) + "\n")
+    path.write_text("".join(lines) + "\n")
+
+
+def _write_csv(path, tracks):
+    lines = ["x,track,y\n"]
+    for k, points in enumerate(tracks):
+        lines.extend("%r,t%d,%r\n" % (x, k, y) for x, y in points)
+    path.write_text("".join(lines))
+
+
+@pytest.mark.parametrize("block_size", [1, 100, 1 << 20])
+def test_read_jsonl(tmp_path, block_size):
+    """The tracks should be parsed as by json, whatever the block size"""
+    tracks = _random_tracks(block_size)
+    source = tmp_path / "tracks.jsonl"
+    _write_jsonl(source, tracks)
+    read = list(loader.read_tracks(str(source), block_size))
+    assert [points.tolist() for points, metadata in read] == tracks
+    assert [metadata for points, metadata in read] == [
+        {"id": k} if k % 4 == 0 else None for k in range(len(tracks))
+    ]
+
+
+@pytest.mark.parametrize("block_size", [1, 100, 1 << 20])
+def test_read_csv(tmp_path, block_size):
+    """Tracks spanning several blocks should be read whole"""
+    tracks = _random_tracks(block_size)
+    source = tmp_path / "tracks.csv"
+    _write_csv(source, tracks)
+    read = list(loader.read_tracks(str(source), block_size))
+    assert [points.tolist() for points, metadata in read] == tracks
+    assert [metadata for points, metadata in read] == [
+        {"track": "t%d" % k} for k in range(len(tracks))
+    ]
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv"])
+def test_decide_file(tmp_path, extension):
+    """The decisions of each block should match Decide.decide"""
+    tracks = _random_tracks(0)
+    source = tmp_path / ("tracks." + extension)
+    (_write_csv if extension == "csv" else _write_jsonl)(source, tracks)
+    decider = decide.Decide(PARAMETERS, LCM, PUV)
+    decisions = np.concatenate(
+        [block for block, metadata in loader.decide_file(decider, str(source), 200)]
+    )
+    assert decisions.any() and not decisions.all()
+    assert decisions.tolist() == [decider.decide(points) for points in tracks]
+
+
+def test_read_empty(tmp_path):
+    """Files without tracks should give no track"""
+    source = tmp_path / "tracks.jsonl"
+    source.write_text("")
+    assert list(loader.read_tracks(str(source))) == []
+    source = tmp_path / "tracks.csv"
+    source.write_text("track,x,y\n")
+    assert list(loader.read_tracks(str(source))) == []
+
+
+def test_read_csv_spaces(tmp_path):
+    """Spaces around the fields, including those of the header, should be ignored"""
+    source = tmp_path / "tracks.csv"
+    source.write_text("track, x, y\na, 0, 1\na, 2.5, 3\nb, 4, 5\n")
+    read = list(loader.read_tracks(str(source)))
+    assert [points.tolist() for points, metadata in read] == [
+        [[0, 1], [2.5, 3]],
+        [[4, 5]],
+    ]
+    assert [metadata for points, metadata in read] == [{"track": "a"}, {"track": "b"}]
+
+
+def test_read_csv_quoted(tmp_path):
+    """Quoted fields should be rejected explicitly"""
+    source = tmp_path / "tracks.csv"
+    source.write_text('track,x,y\n"a,1",0,1\n')
+    with pytest.raises(ValueError, match="quoted"):
+        list(loader.read_tracks(str(source)))
+
+
+@pytest.mark.parametrize(
+    "name, text",
+    [
+        ("tracks.jsonl", "[[0, 1], [2]]\n"),
+        ("tracks.jsonl", '[[0, 1], ["a", 2]]\n'),
+        ("tracks.jsonl", '{"points": [[0, 1], [2]]}\n'),
+        ("tracks.jsonl", '{"points": [[0, 1], ["a", 2]]}\n'),
+        ("tracks.csv", "x,y\n0,1\n"),
+        ("tracks.csv", "track,x,y\na,0,\n"),
+    ],
+)
+def test_read_value_error(tmp_path, name, text):
+    """Malformed coordinates should be rejected"""
+    source = tmp_path / name
+    source.write_text(text)
+    with pytest.raises(ValueError):
+        list(loader.read_tracks(str(source)))
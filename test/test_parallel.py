@@ -0,0 +1,136 @@
+import pytest
+
+import numpy as np
+
+from decide import decide
+from decide import kernels
+from decide import parallel
+
+from .helpers import LCM, PARAMETERS, PUV, random_batch
+
+needs_shared_memory = pytest.mark.skipif(
+    parallel.shared_memory is None, reason="needs Python 3.8 or later"
+)
+
+
+@needs_shared_memory
+@pytest.mark.parametrize("chunk_size, ordered", [(1, True), (7, False), (1000, True)])
+def test_parallel_decide_many(chunk_size, ordered):
+    """
+    The parallel decisions should match Decide.decide_many on a ragged batch
+    """
+    points, offsets = random_batch(chunk_size, 40)
+    expected = decide.Decide(PARAMETERS, LCM, PUV).decide_many(points, offsets)
+    assert expected.any() and not expected.all()
+    with parallel.ParallelDecide(
+        PARAMETERS, LCM, PUV, workers=2, chunk_size=chunk_size, ordered=ordered
+    ) as decider:
+        assert decider.decide_many(points, offsets).tolist() == expected.tolist()
+        chunks = list(decider.iter_decisions(points, offsets))
+    if ordered:
+        assert [first for first, stop, chunk in chunks] == sorted(
+            first for first, stop, chunk in chunks
+        )
+    decisions = np.zeros(len(expected), dtype=bool)
+    for first, stop, chunk in chunks:
+        decisions[first:stop] = chunk
+    assert decisions.tolist() == expected.tolist()
+
+
+@needs_shared_memory
+def test_parallel_decide_many_dense():
+    """Dense batches of tracks should be split into tracks"""
+    tracks = np.random.RandomState(0).normal(scale=2, size=(25, 4, 2))
+    expected = decide.Decide(PARAMETERS, LCM, PUV).decide_many(tracks)
+    assert expected.any() and not expected.all()
+    with parallel.ParallelDecide(PARAMETERS, LCM, PUV, workers=2) as decider:
+        assert decider.decide_many(tracks).tolist() == expected.tolist()
+        assert decider.decide_many(np.zeros((0, 4, 2))).tolist() == []
+
+
+@needs_shared_memory
+def test_parallel_iter_decisions_closed_early():
+    """
+    Stopping iter_decisions early should wait for the chunks still running, and leave
+    the pool usable
+    """
+    points, offsets = random_batch(0, 40)
+    expected = decide.Decide(PARAMETERS, LCM, PUV).decide_many(points, offsets)
+    with parallel.ParallelDecide(
+        PARAMETERS, LCM, PUV, workers=2, chunk_size=1
+    ) as decider:
+        chunks = decider.iter_decisions(points, offsets)
+        first, stop, chunk = next(chunks)
+        chunks.close()
+        assert chunk.tolist() == expected[first:stop].tolist()
+        assert decider.decide_many(points, offsets).tolist() == expected.tolist()
+
+
+@needs_shared_memory
+@pytest.mark.parametrize("workers, chunk_size", [(0, 10), (2, 0)])
+def test_parallel_value_error(workers, chunk_size):
+    """There should be at least one worker and one track per chunk"""
+    with pytest.raises(ValueError):
+        parallel.ParallelDecide(PARAMETERS, LCM, PUV, workers, chunk_size)
+
+
+@pytest.mark.parametrize(
+    "num_points, chunk_size, halo", [(1, 4, 2), (3, 4, 5), (10, 3, 2), (50, 7, 5)]
+)
+def test_chunk_plan(num_points, chunk_size, halo):
+    """Every window of up to halo + 1 points should lie inside a chunk"""
+    chunks = kernels.chunk_plan(num_points, chunk_size, halo)
+    for size in range(1, min(halo + 1, num_points) + 1):
+        for start in range(num_points - size + 1):
+            assert any(
+                first <= start and start + size <= stop for first, stop in chunks
+            )
+    if len(chunks) > 1:
+        assert all(stop - first > halo for first, stop in chunks)
+
+
+@needs_shared_memory
+@pytest.mark.parametrize("track_chunk_size", [1, 5, 64, 10000])
+def test_parallel_single_track(track_chunk_size):
+    """
+    The CMV and the decision of a track split into chunks should match those of the
+    whole track
+    """
+    rng = np.random.RandomState(track_chunk_size)
+    parameters = dict(PARAMETERS, length1=6, radius1=3, area1=8, q_pts=5, quads=3)
+    parameters.update(n_pts=6, dist=4)
+    points = rng.normal(scale=1.5, size=(300, 2))
+    conditions = decide.VectorizedLaunchInterceptorConditions(parameters)
+    with parallel.ParallelDecide(
+        parameters, LCM, PUV, workers=2, track_chunk_size=track_chunk_size
+    ) as decider:
+        expected = conditions.get_conditions_met_vector(points)
+        assert decider.get_conditions_met_vector(points) == expected
+        expected = conditions.get_conditions_met_vector(points, [3, 6])
+        assert decider.get_conditions_met_vector(points, [3, 6]) == expected
+        # The track launches, and does not once shrunk
+        for track, launch in [(points, True), (points / 10, False)]:
+            assert decide.Decide(parameters, LCM, PUV).decide(track) is launch
+            assert decider.decide_track(track) is launch
+
+
+@needs_shared_memory
+def test_parallel_single_track_failure():
+    """
+    A failure while the chunks of a track are running should wait for them, and leave
+    the pool usable
+    """
+    points = np.random.RandomState(0).normal(scale=1.5, size=(300, 2))
+    expected = decide.Decide(PARAMETERS, LCM, PUV).decide(points)
+
+    def settled(cmv_code):
+        if cmv_code:
+            raise RuntimeError("settled")
+        return False
+
+    with parallel.ParallelDecide(
+        PARAMETERS, LCM, PUV, workers=2, track_chunk_size=5
+    ) as decider:
+        with pytest.raises(RuntimeError):
+            decider._latch(points, [0, 1, 3], settled)
+        assert decider.decide_track(points) is expected
@@ -0,0 +1,117 @@
+import pytest
+
+import numpy as np
+
+from decide import decide
+from decide import results
+from decide import store
+
+from .helpers import LCM, PARAMETERS, PUV, random_batch, random_parameters
+
+
+@pytest.mark.parametrize("batch_sizes", [[1] * 20, [3, 5, 13, 1], [64], [0, 9, 0, 8]])
+def test_results_append(tmp_path, batch_sizes):
+    """Batches appended one after the other should be read back as one"""
+    rng = np.random.RandomState(len(batch_sizes))
+    num_tracks = sum(batch_sizes)
+    cmv_codes = rng.randint(0, decide.ALL_LICS_MASK + 1, num_tracks)
+    fuv_codes = rng.randint(0, decide.ALL_LICS_MASK + 1, num_tracks)
+    decisions = rng.random_sample(num_tracks) < 0.5
+    path = str(tmp_path / "results")
+    first = 0
+    for size in batch_sizes:
+        # A new writer should go on after the tracks already written
+        writer = results.ResultWriter(path)
+        assert writer.num_tracks == first
+        stop = first + size
+        writer.append(
+            cmv_codes[first:stop], fuv_codes[first:stop], decisions[first:stop]
+        )
+        first = stop
+    reader = results.ResultReader(path)
+    assert len(reader) == num_tracks
+    assert reader.cmv_codes.tolist() == cmv_codes.tolist()
+    assert reader.fuv_codes.tolist() == fuv_codes.tolist()
+    assert reader.decisions.tolist() == decisions.tolist()
+    assert reader.count_launches() == decisions.sum()
+    assert reader.cmvs().tolist() == decide.decode_vectors(cmv_codes).tolist()
+    assert reader.count_conditions_met(7).tolist() == (
+        decide.decode_vectors(cmv_codes).sum(axis=0).tolist()
+    )
+
+
+def test_results_record(tmp_path):
+    """The recorded results should match the Decide instance"""
+    decider = decide.Decide(PARAMETERS, LCM, PUV)
+    path = str(tmp_path / "results")
+    writer = results.ResultWriter(path)
+    points, offsets = random_batch(0, 20)
+    expected = decider.decide_many(points, offsets)
+    assert writer.record(decider, points, offsets).tolist() == expected.tolist()
+    points, offsets = random_batch(1, 13)
+    writer.record(decider, points, offsets)
+    reader = results.ResultReader(path)
+    assert len(reader) == 33
+    assert reader.decisions.any() and not reader.decisions.all()
+    assert reader.check()
+    cmv = decider.lic.get_conditions_met_vector(points[offsets[-2] :])
+    assert reader.cmvs(slice(-1, None)).tolist() == [cmv]
+    pum = decider.compute_preliminary_unlocking_matrix(cmv)
+    fuv = decider.compute_final_unlocking_vector(pum)
+    assert reader.fuvs(slice(-1, None)).tolist() == [fuv]
+
+
+def test_results_store(tmp_path):
+    """The decisions on a track store should also be written as columns"""
+    points, offsets = random_batch(2, 30)
+    path = str(tmp_path / "tracks.bin")
+    store.write_tracks(path, [points[a:b] for a, b in zip(offsets[:-1], offsets[1:])])
+    decider = decide.Decide(PARAMETERS, LCM, PUV)
+    writer = results.ResultWriter(str(tmp_path / "results"))
+    decisions = store.TrackStore(path).decide_many(decider, 7, writer)
+    reader = results.ResultReader(str(tmp_path / "results"))
+    assert reader.decisions.tolist() == decisions.tolist()
+    assert reader.decisions.tolist() == decider.decide_many(points, offsets).tolist()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_results_store_agrees(tmp_path, seed):
+    """
+    The decisions on a track store should be the same with or without a writer, for
+    parameters that are valid for every LIC
+    """
+    points, offsets = random_batch(seed, 30)
+    path = str(tmp_path / "tracks.bin")
+    store.write_tracks(path, [points[a:b] for a, b in zip(offsets[:-1], offsets[1:])])
+    rng = np.random.RandomState(seed)
+    parameters = dict(random_parameters(rng), q_pts=3, n_pts=3)
+    decider = decide.Decide(parameters, LCM, PUV)
+    tracks_store = store.TrackStore(path)
+    writer = results.ResultWriter(str(tmp_path / "results"))
+    decisions = tracks_store.decide_many(decider, 7)
+    assert tracks_store.decide_many(decider, 7, writer).tolist() == decisions.tolist()
+
+
+def test_results_record_checks_all_lics(tmp_path):
+    """
+    Recording the results should check the parameters of the LICs that do not change
+    the decision, which deciding alone skips
+    """
+    points, offsets = random_batch(0, 10)
+    decider = decide.Decide(dict(PARAMETERS, q_pts=50), LCM, PUV)
+    assert 4 not in decider.relevant_lics
+    decider.decide_many(points, offsets)
+    with pytest.raises(ValueError):
+        results.ResultWriter(str(tmp_path)).record(decider, points, offsets)
+
+
+def test_results_value_error(tmp_path):
+    """The columns should have the same length"""
+    writer = results.ResultWriter(str(tmp_path))
+    with pytest.raises(ValueError):
+        writer.append([1, 2], [3], [True, False])
+    (tmp_path / results.FUV_FILE).write_bytes(b"\0\0")
+    with pytest.raises(ValueError):
+        results.ResultWriter(str(tmp_path))
+    with pytest.raises(ValueError):
+        results.ResultReader(str(tmp_path))
@@ -0,0 +1,130 @@
+import pytest
+import json
+import os
+
+import numpy as np
+
+from decide import decide
+from decide import store
+
+from .helpers import LCM, PARAMETERS, PUV, random_tracks
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_store_round_trip(tmp_path, dtype):
+    """The tracks and their metadata should be read back as written"""
+    tracks = random_tracks(0)
+    metadata = [{"id": k} if k % 3 else None for k in range(len(tracks))]
+    path = str(tmp_path / "tracks.bin")
+    store.write_tracks(path, tracks, metadata, dtype)
+    tracks_store = store.TrackStore(path)
+    assert len(tracks_store) == len(tracks)
+    assert tracks_store.points.dtype == dtype
+    for k, points in enumerate(tracks):
+        assert np.array_equal(tracks_store[k], points.astype(dtype))
+    assert np.array_equal(tracks_store[-1], tracks[-1].astype(dtype))
+    assert tracks_store.metadata == metadata
+    with pytest.raises(IndexError):
+        tracks_store[len(tracks)]
+
+
+def test_store_extend(tmp_path):
+    """Batches of tracks should be appended after the tracks already written"""
+    tracks = random_tracks(1)
+    points = np.concatenate(tracks[10:])
+    offsets = np.cumsum([0] + [len(track) for track in tracks[10:]])
+    path = str(tmp_path / "tracks.bin")
+    with store.TrackStoreWriter(path) as writer:
+        for track in tracks[:10]:
+            writer.append(track.tolist())
+        writer.extend(points, offsets)
+    tracks_store = store.TrackStore(path)
+    assert [track.tolist() for track in tracks_store] == [
+        track.tolist() for track in tracks
+    ]
+    assert tracks_store.metadata == [None] * len(tracks)
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_store_decide_many(tmp_path, batch_size):
+    """The decisions on the store should match Decide.decide_many"""
+    tracks = random_tracks(batch_size)
+    path = str(tmp_path / "tracks.bin")
+    store.write_tracks(path, tracks)
+    decider = decide.Decide(PARAMETERS, LCM, PUV)
+    points = np.concatenate(tracks)
+    offsets = np.cumsum([0] + [len(track) for track in tracks])
+    expected = decider.decide_many(points, offsets)
+    assert expected.any() and not expected.all()
+    tracks_store = store.TrackStore(path)
+    assert tracks_store.decide_many(decider, batch_size).tolist() == expected.tolist()
+    assert decider.decide_many(tracks_store.points, tracks_store.offsets).tolist() == (
+        expected.tolist()
+    )
+
+
+def test_store_empty(tmp_path):
+    """A store without tracks should be readable"""
+    path = str(tmp_path / "tracks.bin")
+    store.write_tracks(path, [])
+    tracks_store = store.TrackStore(path)
+    assert len(tracks_store) == 0
+    assert tracks_store.points.shape == (0, 2)
+
+
+def test_convert_json(tmp_path):
+    """Tracks should be converted from JSON, with or without metadata"""
+    source = tmp_path / "tracks.json"
+    tracks = [[[0, 0], [1, 2]], {"points": [[3, 4], [5, 6], [7, 8]], "id": "a"}]
+    source.write_text(json.dumps(tracks))
+    path = str(tmp_path / "tracks.bin")
+    store.convert_json(str(source), path)
+    tracks_store = store.TrackStore(path)
+    assert [track.tolist() for track in tracks_store] == [
+        tracks[0],
+        tracks[1]["points"],
+    ]
+    assert tracks_store.metadata == [None, {"id": "a"}]
+
+
+def test_convert_json_failure(tmp_path):
+    """A conversion that fails should leave the previous store untouched"""
+    path = str(tmp_path / "tracks.bin")
+    store.write_tracks(path, [[[0, 0], [1, 2]], [[3, 4]]])
+    source = tmp_path / "tracks.json"
+    source.write_text(json.dumps([[[5, 6]], {"id": "a"}]))
+    with pytest.raises(KeyError):
+        store.convert_json(str(source), path)
+    assert [track.tolist() for track in store.TrackStore(path)] == [
+        [[0, 0], [1, 2]],
+        [[3, 4]],
+    ]
+    assert sorted(os.listdir(str(tmp_path))) == ["tracks.bin", "tracks.json"]
+
+
+def test_convert_csv(tmp_path):
+    """Consecutive rows of the same track should be converted to one track"""
+    source = tmp_path / "tracks.csv"
+    source.write_text("track,x,y\na,0,0\na,1,2\nb,3,4\nb,5,6\nb,7,8\n")
+    path = str(tmp_path / "tracks.bin")
+    store.convert_csv(str(source), path, np.float32)
+    tracks_store = store.TrackStore(path)
+    assert [track.tolist() for track in tracks_store] == [
+        [[0, 0], [1, 2]],
+        [[3, 4], [5, 6], [7, 8]],
+    ]
+    assert tracks_store.metadata == [{"track": "a"}, {"track": "b"}]
+
+
+def test_store_value_error(tmp_path):
+    """Files that are not track stores, and other coordinate types, are rejected"""
+    path = tmp_path / "tracks.bin"
+    path.write_bytes(b"[[0, 0]]")
+    with pytest.raises(ValueError):
+        store.TrackStore(str(path))
+    with pytest.raises(ValueError):
+        store.TrackStoreWriter(str(path), np.int64)
+    source = tmp_path / "tracks.csv"
+    source.write_text("x,y\n0,0\n")
+    with pytest.raises(ValueError):
+        store.convert_csv(str(source), str(path))
@@ -0,0 +1,148 @@
+import pytest
+
+import numpy as np
+
+from decide import decide
+from decide import streaming
+
+from .helpers import PARAMETERS, random_parameters
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_streaming_cmv_push(seed):
+    """
+    The streaming CMV should match the CMV of every prefix of the track
+    """
+    rng = np.random.RandomState(seed)
+    parameters = random_parameters(rng)
+    points = rng.normal(scale=1.5, size=(30, 2)).tolist()
+    conditions = streaming.StreamingLaunchInterceptorConditions(parameters)
+    reference = decide.LaunchInterceptorConditions(parameters)
+    longest = max(parameters["q_pts"], parameters["n_pts"])
+    for length in range(1, len(points) + 1):
+        conditions.push(points[length - 1])
+        if length >= longest:
+            assert conditions.cmv == reference.get_conditions_met_vector(
+                points[:length]
+            )
+    assert conditions.num_points == len(points)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_streaming_cmv_extend(seed):
+    """
+    Extending the track by blocks should give the same CMV as pushing each point
+    """
+    rng = np.random.RandomState(seed)
+    parameters = random_parameters(rng)
+    points = rng.normal(scale=1.5, size=(40, 2))
+    pushed = streaming.StreamingLaunchInterceptorConditions(parameters)
+    extended = streaming.StreamingLaunchInterceptorConditions(parameters)
+    start = 0
+    for stop in sorted(rng.choice(np.arange(1, 40), 6, replace=False)) + [40]:
+        for point in points[start:stop]:
+            pushed.push(point)
+        extended.extend(points[start:stop])
+        assert extended.cmv == pushed.cmv
+        start = stop
+
+
+def test_streaming_short_track():
+    """
+    LICs whose windows are longer than the track so far should not be met
+    """
+    conditions = streaming.StreamingLaunchInterceptorConditions(
+        dict(PARAMETERS, q_pts=4, quads=1)
+    )
+    assert conditions.extend([[1, 1], [-1, 1], [-1, -1]]) == [1, 2, 5]
+    assert conditions.push([1, -1]) == [4]
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        dict(PARAMETERS, epsilon=-1),
+        dict(PARAMETERS, area1=-1),
+        dict(PARAMETERS, q_pts=1),
+        dict(PARAMETERS, quads=4),
+        dict(PARAMETERS, dist=-1),
+    ],
+)
+def test_streaming_value_error(parameters):
+    """The parameters should be checked when the streaming evaluator is created"""
+    with pytest.raises(ValueError):
+        streaming.StreamingLaunchInterceptorConditions(parameters)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_streaming_decide(seed):
+    """
+    The streaming decision should match the decision on every prefix of the track
+    """
+    rng = np.random.RandomState(seed)
+    parameters = random_parameters(rng)
+    lcm = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    enabled = rng.choice(7, 2, replace=False)
+    puv = [i in enabled for i in range(decide.NUMBER_OF_LICS)]
+    points = rng.normal(scale=1.5, size=(30, 2)).tolist()
+    streamed = streaming.StreamingDecide(parameters, lcm, puv)
+    decider = decide.Decide(parameters, lcm, puv)
+    longest = max(parameters["q_pts"], parameters["n_pts"])
+    assert streamed.launch is False
+    for length in range(1, len(points) + 1):
+        launch = streamed.push(points[length - 1])
+        if length >= longest:
+            assert launch is decider.decide(points[:length])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sliding_window_cmv(seed):
+    """
+    The sliding window CMV should match the CMV of the most recent points
+    """
+    rng = np.random.RandomState(seed)
+    parameters = random_parameters(rng)
+    window = rng.randint(6, 12)
+    points = rng.normal(scale=1.5, size=(60, 2)).tolist()
+    pushed = streaming.StreamingLaunchInterceptorConditions(parameters, window=window)
+    extended = streaming.StreamingLaunchInterceptorConditions(parameters, window=window)
+    reference = decide.LaunchInterceptorConditions(parameters)
+    for length in range(1, len(points) + 1):
+        pushed.push(points[length - 1])
+        if length % 7 == 0:
+            extended.extend(points[length - 7 : length])
+            assert extended.cmv == pushed.cmv
+        if length >= window:
+            assert pushed.cmv == reference.get_conditions_met_vector(
+                points[length - window : length]
+            )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sliding_window_decide(seed):
+    """
+    The sliding window decision should match the decision on the most recent points
+    """
+    rng = np.random.RandomState(seed)
+    parameters = random_parameters(rng)
+    window = rng.randint(6, 12)
+    lcm = [["ANDD"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    enabled = rng.choice(7, 2, replace=False)
+    puv = [i in enabled for i in range(decide.NUMBER_OF_LICS)]
+    points = rng.normal(scale=1.5, size=(60, 2)).tolist()
+    streamed = streaming.StreamingDecide(parameters, lcm, puv, window=window)
+    decider = decide.Decide(parameters, lcm, puv)
+    for length in range(1, len(points) + 1):
+        launch = streamed.push(points[length - 1])
+        if length >= window:
+            assert launch is decider.decide(points[length - window : length])
+
+
+@pytest.mark.parametrize(
+    "parameters, window",
+    [(dict(PARAMETERS, q_pts=5), 4), (dict(PARAMETERS, n_pts=5), 4), (PARAMETERS, 0)],
+)
+def test_sliding_window_value_error(parameters, window):
+    """The windows of LIC 4 and LIC 6 should fit in the sliding window"""
+    with pytest.raises(ValueError):
+        streaming.StreamingLaunchInterceptorConditions(parameters, window=window)
@@ -0,0 +1,135 @@
+import pytest
+import math
+
+import numpy as np
+
+from decide import decide
+from decide import summary
+
+from .helpers import random_parameters
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_summary_cmv(seed):
+    """
+    The CMV computed from the summary should match the CMV computed from the points,
+    for any parameters
+    """
+    rng = np.random.RandomState(seed)
+    points = rng.normal(scale=2, size=(rng.randint(6, 30), 2))
+    points[rng.randint(len(points))] = points[rng.randint(len(points))]
+    track = summary.TrackSummary(points)
+    for i in range(20):
+        parameters = random_parameters(rng)
+        reference = decide.LaunchInterceptorConditions(parameters)
+        assert track.get_conditions_met_vector(
+            parameters
+        ) == reference.get_conditions_met_vector(points.tolist())
+
+
+@pytest.mark.parametrize(
+    "points, expected",
+    [
+        ([], [0, None, None, None, None]),
+        ([[1, 1], [1, 2], [-1, 1]], [0, 1, 2, None, None]),
+        ([[1, 1], [-1, 1], [1, 1], [-1, -1], [1, -1]], [0, 1, 2, 3, 4]),
+        ([[1, 1], [-1, 1], [-1, 1], [-1, -1], [-1, -1], [1, -1]], [0, 1, 2, 4, 6]),
+    ],
+)
+def test_summary_quadrant_window_lengths(points, expected):
+    """The shortest windows lying in k distinct quadrants should be found"""
+    assert summary.TrackSummary(points).quadrant_window_lengths == expected
+
+
+def test_summary_chord_distance_cache():
+    """The chord distances should be computed once per N_PTS"""
+    track = summary.TrackSummary([[0, 0], [1, 1], [2, 0], [3, 3]])
+    assert track.chord_distance(3) == pytest.approx(math.sqrt(2))
+    track.points = None
+    assert track.chord_distance(3) == pytest.approx(math.sqrt(2))
+
+
+def test_summary_short_track():
+    """LICs should not be met by tracks too short for their windows"""
+    track = summary.TrackSummary([[0, 0]])
+    parameters = {"length1": -1, "radius1": -1, "epsilon": 0, "area1": 0}
+    assert (
+        track.get_conditions_met_vector(parameters, lics=[0, 1, 2, 3, 5])
+        == [False] * decide.NUMBER_OF_LICS
+    )
+
+
+@pytest.mark.parametrize(
+    "lic, parameters",
+    [
+        (2, {"epsilon": -1}),
+        (3, {"area1": -1}),
+        (4, {"q_pts": 3, "quads": 1}),
+        (4, {"q_pts": 2, "quads": 0}),
+        (6, {"n_pts": 2, "dist": -1}),
+    ],
+)
+def test_summary_value_error(lic, parameters):
+    """The parameters should be checked as when evaluating the points"""
+    track = summary.TrackSummary([[0, 0], [1, 1]])
+    with pytest.raises(ValueError):
+        track.condition_met(lic, parameters)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_summary_decide(seed):
+    """The decision computed from the summary should match Decide.decide"""
+    rng = np.random.RandomState(seed)
+    lcm = [["ANDD"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    puv = [i in rng.choice(7, 2, replace=False) for i in range(decide.NUMBER_OF_LICS)]
+    points = rng.normal(scale=2, size=(20, 2))
+    track = summary.TrackSummary(points)
+    for i in range(10):
+        decider = decide.Decide(random_parameters(rng), lcm, puv)
+        assert track.decide(decider) is decider.decide(points)
+
+
+def test_parameter_grid():
+    """The grid should contain every combination of the values"""
+    grid = summary.parameter_grid({"length1": [1, 2], "n_pts": (3, 4, 5), "dist": 1})
+    assert len(grid) == 6
+    assert grid[0] == {"length1": 1, "n_pts": 3, "dist": 1}
+    assert grid[-1] == {"length1": 2, "n_pts": 5, "dist": 1}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sweep(seed):
+    """
+    The sweep should give the CMV and the decision of each set of parameters
+    """
+    rng = np.random.RandomState(seed)
+    lcm = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    puv = [i in rng.choice(7, 3, replace=False) for i in range(decide.NUMBER_OF_LICS)]
+    points = rng.normal(scale=2, size=(25, 2))
+    parameter_sets = [random_parameters(rng) for i in range(30)]
+    cmvs, decisions = summary.sweep(points, parameter_sets, lcm, puv)
+    assert cmvs.shape == (30, decide.NUMBER_OF_LICS)
+    for parameters, cmv, decision in zip(parameter_sets, cmvs, decisions):
+        reference = decide.LaunchInterceptorConditions(parameters)
+        assert cmv.tolist() == reference.get_conditions_met_vector(points.tolist())
+        assert decision == decide.Decide(parameters, lcm, puv).decide(points)
+
+
+def test_sweep_value_error():
+    """Every set of parameters should be checked"""
+    parameter_sets = summary.parameter_grid(
+        {
+            "length1": 1,
+            "radius1": 1,
+            "epsilon": 1,
+            "area1": [1, -1],
+            "q_pts": 2,
+            "quads": 1,
+            "n_pts": 3,
+            "dist": 1,
+        }
+    )
+    lcm = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    puv = [True] + [False] * (decide.NUMBER_OF_LICS - 1)
+    with pytest.raises(ValueError):
+        summary.sweep([[0, 0], [1, 1], [2, 0]], parameter_sets, lcm, puv)
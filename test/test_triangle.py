@@ -12,6 +12,7 @@ from decide import decide
         ([0, 0], [2, 2], [4, 0], 4, "Area of right isoceles triangle"),
         ([10, 0], [0, 0], [5, 8.66], 43.3, "Area of equilateral triangle"),
         ([23, 30], [15, 15], [50, 25], 222.5, "Area of obtuse scalene triangle"),
+        ([0, 0], [0.9, 0.4], [6.3, 2.8], 0, "Area should be 0 for a thin triangle"),
     ],
 )
 def test_triangle_area(point1, point2, point3, expected_area, message):
@@ -45,6 +46,27 @@ def test_triangle_circumradius(point1, point2, point3, expected_radius):
     assert triangle.circumradius() == pytest.approx(expected_radius)
 
 
+@pytest.mark.parametrize(
+    "point1, point2, point3, expected_radius",
+    [
+        ([0, 0], [1, 0], [0.5, 0.86602539], 0.5773502645948126),
+        ([0, 0], [1, 0], [0.5, 10], 5.0125),
+        ([0, 0], [0, 4], [2, 2], 2),
+        ([0, 0], [1, 0], [10, 2], math.sqrt(104) / 2),
+        ([0, 0], [2, 2], [4, 4], math.sqrt(32) / 2),
+        ([0, 0], [0, 1], [0, 2], 1),
+    ],
+)
+def test_triangle_enclosing_radius(point1, point2, point3, expected_radius):
+    """
+    Verify that the enclosing_radius function returns expected values
+    """
+    triangle = decide.Triangle(
+        decide.Point(point1), decide.Point(point2), decide.Point(point3)
+    )
+    assert triangle.enclosing_radius() == pytest.approx(expected_radius)
+
+
 @pytest.mark.parametrize(
     "point1, point2, point3, expected_angle",
     [
@@ -0,0 +1,264 @@
+import pytest
+import math
+
+import numpy as np
+
+from decide import decide
+from decide import kernels
+
+from .helpers import PARAMETERS, random_parameters
+
+
+@pytest.mark.parametrize(
+    "points",
+    [
+        [[0, 0], [1, 0], [2, 0], [3, 0], [3, 3]],
+        [[0, 0], [2, 2], [0, 0], [1, -1], [-1, -1]],
+        [[1, 1], [1, 1], [1, 1], [1, -1], [1, -1]],
+        [[0, 1], [0, 0], [1, 0], [0, 0], [0, 1]],
+    ],
+)
+def test_vectorized_cmv_fixed_tracks(points):
+    """
+    The vectorized engine should produce the same CMV as the reference engine
+    """
+    reference = decide.LaunchInterceptorConditions(PARAMETERS)
+    vectorized = decide.VectorizedLaunchInterceptorConditions(PARAMETERS)
+    assert vectorized.get_conditions_met_vector(
+        points
+    ) == reference.get_conditions_met_vector(points)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_vectorized_cmv_random_tracks(seed):
+    """
+    The vectorized engine should produce the same CMV as the reference engine on random
+    tracks and parameters
+    """
+    rng = np.random.RandomState(seed)
+    points = rng.normal(scale=2, size=(rng.randint(5, 30), 2)).tolist()
+    parameters = random_parameters(rng)
+    reference = decide.LaunchInterceptorConditions(parameters)
+    vectorized = decide.VectorizedLaunchInterceptorConditions(parameters)
+    assert vectorized.get_conditions_met_vector(
+        np.array(points)
+    ) == reference.get_conditions_met_vector(points)
+
+
+@pytest.mark.parametrize(
+    "lic, points, parameters",
+    [
+        ("lic_2", [[-1, 0], [0, 0], [1, 0]], {"epsilon": math.pi}),
+        ("lic_3", [[-1, 0], [0, 0], [1, 0]], {"area1": -1}),
+        ("lic_4", [[1, 1], [1, 1]], {"q_pts": 3, "quads": 1}),
+        ("lic_4", [[1, 1], [1, 1]], {"q_pts": 2, "quads": 0}),
+        ("lic_6", [[0, 0], [2, 2], [0, 0]], {"n_pts": 4, "dist": 1}),
+        ("lic_6", [[0, 0], [2, 2], [0, 0]], {"n_pts": 3, "dist": -1}),
+    ],
+)
+def test_vectorized_value_errors(lic, points, parameters):
+    """
+    The vectorized engine should reject the same parameter values as the reference
+    """
+    vectorized = decide.VectorizedLaunchInterceptorConditions(parameters)
+    with pytest.raises(ValueError):
+        getattr(vectorized, lic)(points)
+
+
+def test_vectorized_points_shape():
+    """Points should be given as [x, y] coordinates"""
+    vectorized = decide.VectorizedLaunchInterceptorConditions(PARAMETERS)
+    with pytest.raises(ValueError):
+        vectorized.lic_0([[0, 0, 0], [1, 1, 1]])
+
+
+def test_decide_vectorized():
+    """Decide should give the same decision with the vectorized engine"""
+    lcm = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    puv = [True] * 3 + [False] * (decide.NUMBER_OF_LICS - 3)
+    points = [[0, 0], [1, 0], [2, 0], [3, 0], [3, 3]]
+    decider = decide.Decide(PARAMETERS, lcm, puv, vectorized=True)
+    assert decider.decide(np.array(points)) is True
+
+
+def _random_configuration(rng):
+    connectors = ["ANDD", "ORR", "NOT_USED", "NOT_USED"]
+    lcm = [[None] * decide.NUMBER_OF_LICS for i in range(decide.NUMBER_OF_LICS)]
+    for row in range(decide.NUMBER_OF_LICS):
+        for column in range(row + 1):
+            lcm[row][column] = lcm[column][row] = connectors[rng.randint(4)]
+    puv = (rng.uniform(size=decide.NUMBER_OF_LICS) < 0.3).tolist()
+    return lcm, puv
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_decide_many_ragged(seed):
+    """
+    decide_many on a ragged batch should match decide on each track
+    """
+    rng = np.random.RandomState(seed)
+    lcm, puv = _random_configuration(rng)
+    decider = decide.Decide(PARAMETERS, lcm, puv)
+    tracks = [rng.normal(scale=2, size=(rng.randint(5, 15), 2)) for i in range(20)]
+    offsets = np.cumsum([0] + [len(track) for track in tracks])
+    decisions, cmvs = decider.decide_many(
+        np.concatenate(tracks), offsets, return_cmv=True
+    )
+    assert decisions.tolist() == [decider.decide(track) for track in tracks]
+    assert cmvs.tolist() == [
+        decider.lic.get_conditions_met_vector(track.tolist()) for track in tracks
+    ]
+    assert decider.decide_many(np.concatenate(tracks), offsets).tolist() == (
+        decisions.tolist()
+    )
+
+
+def test_decide_many_dense():
+    """
+    decide_many on a dense batch should match decide on each track
+    """
+    rng = np.random.RandomState(0)
+    lcm = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    puv = [True] * 7 + [False] * (decide.NUMBER_OF_LICS - 7)
+    decider = decide.Decide(PARAMETERS, lcm, puv)
+    tracks = rng.normal(scale=2, size=(50, 6, 2))
+    assert decider.decide_many(tracks).tolist() == [
+        decider.decide(track) for track in tracks
+    ]
+
+
+def test_decide_many_track_boundaries():
+    """
+    Windows of consecutive points should not straddle two tracks
+    """
+    lcm = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    puv = [i in (0, 4, 5) for i in range(decide.NUMBER_OF_LICS)]
+    parameters = dict(PARAMETERS, q_pts=2, quads=1, n_pts=2)
+    decider = decide.Decide(parameters, lcm, puv)
+    points = [[0, 0], [1, 0], [5, 0], [6, 0], [-3, -3], [-2, -2], [-1, -1]]
+    decisions, cmvs = decider.decide_many(points, [0, 2, 4, 7], return_cmv=True)
+    assert decisions.tolist() == [False, False, False]
+    assert not cmvs[:, [0, 4, 5]].any()
+    assert decider.decide_many(points, [0, 7]).tolist() == [True]
+
+
+@pytest.mark.parametrize(
+    "points, offsets",
+    [
+        ([[0, 0], [1, 0], [2, 0]], [0, 2]),
+        ([[0, 0], [1, 0], [2, 0]], [1, 3]),
+        ([[0, 0], [1, 0], [2, 0]], [0, 2, 1, 3]),
+        ([[[0, 0, 0], [1, 0, 0]]], None),
+    ],
+)
+def test_decide_many_value_error(points, offsets):
+    """Offsets should increase from 0 to the number of points"""
+    lcm = [["ORR"] * decide.NUMBER_OF_LICS] * decide.NUMBER_OF_LICS
+    puv = [True] + [False] * (decide.NUMBER_OF_LICS - 1)
+    decider = decide.Decide(PARAMETERS, lcm, puv)
+    with pytest.raises(ValueError):
+        decider.decide_many(points, offsets)
+
+
+@pytest.mark.parametrize(
+    "n_pts, block_size", [(3, 1), (5, 7), (40, 100), (40, 1 << 20)]
+)
+def test_chord_distances(n_pts, block_size):
+    """
+    The chord distances should match the distances to the line of each window, and
+    should not depend on the size of the blocks of windows
+    """
+    rng = np.random.RandomState(n_pts)
+    points = rng.normal(size=(120, 2))
+    points[50 + n_pts - 1] = points[50]
+    expected = []
+    for i in range(len(points) - n_pts + 1):
+        start = decide.Point(points[i])
+        end = decide.Point(points[i + n_pts - 1])
+        largest = 0
+        for j in range(i + 1, i + n_pts - 1):
+            point = decide.Point(points[j])
+            if start == end:
+                dist = start.distance(point)
+            else:
+                dist = (
+                    2 * decide.Triangle(start, end, point).area() / start.distance(end)
+                )
+            largest = max(largest, dist)
+        expected.append(largest)
+    distances = kernels.chord_distances(points, n_pts, block_size)
+    assert np.allclose(distances, expected)
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_chord_distances_hull(seed):
+    """
+    The convex hull kernel should give the same distances as the exact kernel, also
+    when the first and last points of windows coincide
+    """
+    rng = np.random.RandomState(seed)
+    num_points = rng.randint(3, 300)
+    n_pts = rng.randint(3, num_points + 1)
+    if seed % 3 == 0:
+        points = rng.normal(size=(num_points, 2))
+    elif seed % 3 == 1:
+        angles = np.linspace(0, 20, num_points)
+        points = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    else:
+        points = np.tile(np.round(rng.normal(size=(n_pts - 1, 2))), (num_points, 1))
+        points = points[:num_points]
+    leaf_size = [1, 2, 5, 32][seed % 4]
+    assert np.allclose(
+        kernels.chord_distances_hull(points, n_pts, leaf_size),
+        kernels.chord_distances(points, n_pts),
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lic_6_hull_mode(seed):
+    """LIC 6 should give the same result with and without convex hulls"""
+    rng = np.random.RandomState(seed)
+    points = rng.normal(size=(200, 2)).cumsum(axis=0)
+    parameters = dict(PARAMETERS, n_pts=rng.randint(40, 150), dist=rng.uniform(5, 30))
+    hull = decide.LaunchInterceptorConditions(parameters, hull_n_pts=10)
+    vectorized = decide.VectorizedLaunchInterceptorConditions(parameters, hull_n_pts=10)
+    expected = decide.LaunchInterceptorConditions(parameters).lic_6(points.tolist())
+    assert hull.lic_6(points.tolist()) is expected
+    assert vectorized.lic_6(points) is expected
+    assert (
+        hull.estimate_costs()[6]
+        < decide.LaunchInterceptorConditions(parameters).estimate_costs()[6]
+    )
+
+
+def test_quadrants_ties():
+    """Points on the axes should get the same quadrant as with Point.quadrant"""
+    points = [[0, 0], [-1, 0], [0, 1], [0, -1], [1, 0], [-1, -1], [1, -1], [-2, 3]]
+    assert kernels.quadrants(np.array(points, dtype=float)).tolist() == [
+        decide.Point(point).quadrant() for point in points
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_triangle_enclosing_radii(seed):
+    """
+    The enclosing radius should be half the longest side of triangles that are not
+    acute, and the circumradius of acute triangles
+    """
+    rng = np.random.RandomState(seed)
+    points = np.round(rng.normal(size=(50, 2)), 1)
+    expected = [
+        decide.Triangle(
+            *[decide.Point(p) for p in points[i : i + 3]]
+        ).enclosing_radius()
+        for i in range(len(points) - 2)
+    ]
+    squared_radii = kernels.triangle_enclosing_radii_squared(points)
+    assert np.allclose(np.sqrt(squared_radii), expected)
+    # The same radii should be given from the shared distances and cross products
+    shared = kernels.triangle_enclosing_radii_squared(
+        points,
+        kernels.consecutive_squared_distances(points),
+        kernels.triangle_cross_products(points),
+    )
+    assert np.array_equal(shared, squared_radii)